@@ -11,6 +11,7 @@
 
 import os
 import csv
+import time
 import logging
 import argparse
 from typing import List, Tuple, Optional
@@ -171,7 +172,6 @@ class BatchUrlProcessor:
                 
                 # 添加延迟
                 if i < len(url_list) - 1:
-                    import time
                     time.sleep(delay)
             
             logger.info(f"批量处理完成: 成功处理 {success_count}/{len(url_list)} 个文件")
@@ -182,6 +182,7 @@ class BatchUrlProcessor:
             # 清理临时文件
             if self.cleanup:
                 self.downloader.cleanup()
+            self.downloader.close()
     
     def initialize_csv_file(self, output_file: str):
         """
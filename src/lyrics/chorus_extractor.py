@@ -11,8 +11,9 @@
 
 import re
 import logging
+from operator import attrgetter
 from typing import List, Optional
-from .summary_generator import LyricLine
+from .summary_generator import LyricLine, sort_by_time
 
 logger = logging.getLogger(__name__)
 
@@ -56,14 +57,19 @@ class ChorusExtractor:
         # 避免的词汇（不适合分享）
         self.avoid_words = [
             '啊啊啊', '哦哦哦', '嗯嗯嗯', '啦啦啦', '嘿嘿嘿',
-            '哈哈', '呵呵', '嘻嘻', '嘿嘿', '哈哈'
+            '哈哈', '呵呵', '嘻嘻', '嘿嘿'
         ]
+        self._pat_avoid = re.compile('|'.join(
+            re.escape(word) for word in sorted(set(self.avoid_words), key=len, reverse=True)
+        ))
         
         logger.info("高潮提取器初始化完成")
     
     def parse_deformed_lrc(self, file_path: str) -> List[LyricLine]:
         """解析变形LRC文件，只提取歌词内容"""
         lyrics = []
+        last_time = -1.0
+        monotonic = True
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -89,12 +95,15 @@ class ChorusExtractor:
                         # 提取歌词文本（去掉时间标签）
                         text = re.sub(r'\[\d{2}:\d{2}\.\d{3}\]', '', lyric_line).strip()
                         if text:
+                            if time < last_time:
+                                monotonic = False
+                            last_time = time
                             lyrics.append(LyricLine(time, text))
         
         except Exception as e:
             logger.error(f"解析变形LRC文件失败: {e}")
         
-        return sorted(lyrics, key=lambda x: x.time)
+        return sort_by_time(lyrics, monotonic)
     
     def extract_chorus_lyrics(self, lyrics: List[LyricLine]) -> List[LyricLine]:
         """提取高潮部分歌词"""
@@ -115,7 +124,7 @@ class ChorusExtractor:
         unique_candidates = self._remove_duplicates(all_candidates)
         
         # 按时间排序
-        unique_candidates.sort(key=lambda x: x.time)
+        unique_candidates.sort(key=attrgetter('time'))
         
         return unique_candidates
     
@@ -143,9 +152,8 @@ class ChorusExtractor:
     def _is_shareable_quote(self, text: str) -> bool:
         """判断是否适合分享的经典歌词"""
         # 过滤掉包含避免词汇的歌词
-        for avoid_word in self.avoid_words:
-            if avoid_word in text:
-                return False
+        if self._pat_avoid.search(text):
+            return False
         
         # 过滤掉太短或太长的歌词
         clean_text = re.sub(r'[^\u4e00-\u9fff]', '', text)
@@ -11,6 +11,7 @@
 
 import argparse
 import os
+import re
 import sys
 import logging
 from typing import List, Tuple
@@ -23,6 +24,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 文件扩展名 -> 歌词格式
+_EXT_TO_FMT = {
+    '.lrc': LyricFormat.LRC,
+    '.krc': LyricFormat.KRC,
+    '.txt': LyricFormat.CUSTOM,
+}
+
+# 格式名称 -> 歌词格式
+_STR_TO_FMT = {
+    'lrc': LyricFormat.LRC,
+    'krc': LyricFormat.KRC,
+    'custom': LyricFormat.CUSTOM,
+}
+
+# 输入文件中的有效记录行（忽略空行和#注释行）
+_MANIFEST_LINE = re.compile(
+    r'^[ \t]*([^#,\s][^,\n]*),([^,\n]*),([^,\n]*),[ \t]*(lrc|krc|custom)[ \t]*(?:,[^\n]*)?\r?$',
+    re.M | re.I
+)
+
+# 输入文件中所有非空、非注释行
+_MANIFEST_ENTRY = re.compile(r'^[ \t]*[^#\s]', re.M)
+
 
 def parse_input_file(input_file: str) -> List[Tuple[str, str, str, LyricFormat]]:
     """解析输入文件，返回歌词文件信息列表"""
@@ -30,33 +54,16 @@ def parse_input_file(input_file: str) -> List[Tuple[str, str, str, LyricFormat]]
     
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                # 格式: 文件路径,歌曲ID,歌曲名称,格式类型
-                parts = line.split(',')
-                if len(parts) >= 4:
-                    file_path = parts[0].strip()
-                    song_id = parts[1].strip()
-                    song_name = parts[2].strip()
-                    format_str = parts[3].strip().lower()
-                    
-                    # 确定格式类型
-                    if format_str == 'lrc':
-                        format_type = LyricFormat.LRC
-                    elif format_str == 'krc':
-                        format_type = LyricFormat.KRC
-                    elif format_str == 'custom':
-                        format_type = LyricFormat.CUSTOM
-                    else:
-                        logger.warning(f"第{line_num}行格式类型未知: {format_str}")
-                        continue
-                    
-                    lyric_files.append((file_path, song_id, song_name, format_type))
-                else:
-                    logger.warning(f"第{line_num}行格式错误: {line}")
+            data = f.read()
+        
+        # 格式: 文件路径,歌曲ID,歌曲名称,格式类型
+        for file_path, song_id, song_name, format_str in _MANIFEST_LINE.findall(data):
+            lyric_files.append((file_path.strip(), song_id.strip(), song_name.strip(),
+                                _STR_TO_FMT[format_str.lower()]))
+        
+        skipped = len(_MANIFEST_ENTRY.findall(data)) - len(lyric_files)
+        if skipped:
+            logger.warning(f"跳过 {skipped} 行格式错误或格式类型未知的记录")
     
     except Exception as e:
         logger.error(f"解析输入文件失败: {e}")
@@ -71,18 +78,13 @@ def scan_directory(directory: str) -> List[Tuple[str, str, str, LyricFormat]]:
     try:
         for root, dirs, files in os.walk(directory):
             for file in files:
-                file_path = os.path.join(root, file)
-                
                 # 根据文件扩展名确定格式
-                if file.endswith('.lrc'):
-                    format_type = LyricFormat.LRC
-                elif file.endswith('.krc'):
-                    format_type = LyricFormat.KRC
-                elif file.endswith('.txt'):
-                    format_type = LyricFormat.CUSTOM
-                else:
+                format_type = _EXT_TO_FMT.get(file[file.rfind('.'):].lower())
+                if format_type is None:
                     continue
                 
+                file_path = os.path.join(root, file)
+                
                 # 生成歌曲ID和名称
                 song_id = f"song_{len(lyric_files) + 1:03d}"
                 song_name = os.path.splitext(file)[0]
@@ -157,12 +159,7 @@ def main():
             sys.exit(1)
         
         # 确定格式类型
-        format_map = {
-            'lrc': LyricFormat.LRC,
-            'krc': LyricFormat.KRC,
-            'custom': LyricFormat.CUSTOM
-        }
-        format_type = format_map[args.format]
+        format_type = _STR_TO_FMT[args.format]
         
         lyric_files = [(args.file, args.id, args.name, format_type)]
         
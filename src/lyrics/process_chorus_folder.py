@@ -26,23 +26,32 @@ logger = logging.getLogger(__name__)
 def process_chorus_folder(input_dir: str, output_dir: str):
     """批量处理歌词文件夹"""
     
-    # 创建输出目录
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    # 创建高潮提取器
-    extractor = ChorusExtractor()
-    
     # 获取输入目录中的所有歌词文件
-    input_path = Path(input_dir)
     lyric_files = []
     
     # 支持的歌词文件扩展名
     supported_extensions = {'.txt', '.lrc', '.krc'}
     
-    for file_path in input_path.iterdir():
-        if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-            lyric_files.append(file_path)
+    try:
+        it = os.scandir(input_dir)
+    except FileNotFoundError:
+        logger.error(f"输入目录不存在: {input_dir}")
+        sys.exit(1)
+    except NotADirectoryError:
+        logger.error(f"输入路径不是目录: {input_dir}")
+        sys.exit(1)
+    
+    with it:
+        for entry in it:
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in supported_extensions:
+                lyric_files.append(Path(entry.path))
+    
+    # 创建输出目录
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    
+    # 创建高潮提取器
+    extractor = ChorusExtractor()
     
     if not lyric_files:
         logger.warning(f"在目录 {input_dir} 中未找到歌词文件")
@@ -66,8 +75,7 @@ def process_chorus_folder(input_dir: str, output_dir: str):
                 output_file = output_path / file_path.name
                 
                 # 写入分享词到文件
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(share_quote)
+                output_file.write_text(share_quote, encoding='utf-8')
                 
                 logger.info(f"成功生成分享词: {file_path.name} -> {share_quote}")
                 success_count += 1
@@ -94,11 +102,6 @@ def main():
     input_dir = sys.argv[1]
     output_dir = sys.argv[2]
     
-    # 检查输入目录是否存在
-    if not os.path.exists(input_dir):
-        logger.error(f"输入目录不存在: {input_dir}")
-        sys.exit(1)
-    
     try:
         # 批量处理歌词文件夹
         process_chorus_folder(input_dir, output_dir)
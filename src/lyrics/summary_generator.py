@@ -12,11 +12,18 @@
 import csv
 import re
 import logging
-from typing import List, Optional, Tuple
+from operator import attrgetter
+from multiprocessing import Pool
+from typing import Iterable, Iterator, List, Optional, Tuple
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+_by_time = attrgetter('time')
+
+# 文件数不超过该值时在当前进程内处理，不启动进程池
+_INLINE_MAX_FILES = 32
+
 
 class LyricFormat(Enum):
     """歌词格式枚举"""
@@ -28,6 +35,8 @@ class LyricFormat(Enum):
 class LyricLine:
     """歌词行数据"""
     
+    __slots__ = ('time', 'text')
+    
     def __init__(self, time: float, text: str):
         self.time = time
         self.text = text.strip()
@@ -36,6 +45,47 @@ class LyricLine:
         return f"[{self.time:.2f}] {self.text}"
 
 
+def sort_by_time(lyrics: List[LyricLine], monotonic: bool) -> List[LyricLine]:
+    """按时间排序歌词，解析时已是升序则直接返回"""
+    return lyrics if monotonic else sorted(lyrics, key=_by_time)
+
+
+def _build_lines(pairs: Iterable[Tuple[float, str]]) -> List[LyricLine]:
+    """由(时间, 文本)序列构建按时间排序的LyricLine列表"""
+    lyrics = []
+    last_time = -1.0
+    monotonic = True
+    
+    for time, text in pairs:
+        if time < last_time:
+            monotonic = False
+        last_time = time
+        lyrics.append(LyricLine(time, text))
+    
+    return sort_by_time(lyrics, monotonic)
+
+
+def _build_texts(pairs: Iterable[Tuple[float, str]]) -> List[str]:
+    """由(时间, 文本)序列得到按时间排序的文本列表，源文件已是升序时不排序"""
+    times = []
+    texts = []
+    last_time = -1.0
+    monotonic = True
+    
+    for time, text in pairs:
+        if time < last_time:
+            monotonic = False
+        last_time = time
+        times.append(time)
+        texts.append(text)
+    
+    if monotonic:
+        return texts
+    
+    order = sorted(range(len(texts)), key=times.__getitem__)
+    return [texts[i] for i in order]
+
+
 class SummaryGenerator:
     """歌词摘要生成器"""
     
@@ -64,15 +114,41 @@ class SummaryGenerator:
         # 避免的词汇（不适合分享）
         self.avoid_words = [
             '啊啊啊', '哦哦哦', '嗯嗯嗯', '啦啦啦', '嘿嘿嘿',
-            '哈哈', '呵呵', '嘻嘻', '嘿嘿', '哈哈'
+            '哈哈', '呵呵', '嘻嘻', '嘿嘿'
         ]
+        self._pat_avoid = re.compile('|'.join(
+            re.escape(word) for word in sorted(set(self.avoid_words), key=len, reverse=True)
+        ))
         
         logger.info("歌词摘要生成器初始化完成")
     
     def parse_lrc_file(self, file_path: str) -> List[LyricLine]:
         """解析LRC文件"""
-        lyrics = []
-        
+        return _build_lines(self._iter_lrc(file_path))
+    
+    def parse_krc_file(self, file_path: str) -> List[LyricLine]:
+        """解析KRC文件"""
+        return _build_lines(self._iter_krc(file_path))
+    
+    def parse_custom_file(self, file_path: str) -> List[LyricLine]:
+        """解析自定义格式文件"""
+        return _build_lines(self._iter_custom(file_path))
+    
+    def parse_lyric_texts(self, file_path: str, format_type: LyricFormat) -> List[str]:
+        """解析歌词文件，只返回按时间排序的歌词文本（不创建LyricLine对象）"""
+        if format_type == LyricFormat.LRC:
+            pairs = self._iter_lrc(file_path)
+        elif format_type == LyricFormat.KRC:
+            pairs = self._iter_krc(file_path)
+        elif format_type == LyricFormat.CUSTOM:
+            pairs = self._iter_custom(file_path)
+        else:
+            raise ValueError(f"不支持的歌词格式: {format_type}")
+        
+        return _build_texts(pairs)
+    
+    def _iter_lrc(self, file_path: str) -> Iterator[Tuple[float, str]]:
+        """逐行解析LRC文件，产出(时间, 歌词文本)"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 for line in f:
@@ -91,48 +167,40 @@ class SummaryGenerator:
                         # 提取歌词文本
                         text = line[time_match.end():].strip()
                         if text:
-                            lyrics.append(LyricLine(time, text))
+                            yield time, text
         
         except Exception as e:
             logger.error(f"解析LRC文件失败: {e}")
-        
-        return sorted(lyrics, key=lambda x: x.time)
     
-    def parse_krc_file(self, file_path: str) -> List[LyricLine]:
-        """解析KRC文件"""
-        lyrics = []
-        
+    def _iter_krc(self, file_path: str) -> Iterator[Tuple[float, str]]:
+        """逐行解析KRC文件，产出(时间, 歌词文本)"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
+            
+            # KRC格式通常是加密的，这里提供基础解析
+            lines = content.split('\n')
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith('['):
+                    continue
                 
-                # KRC格式通常是加密的，这里提供基础解析
-                lines = content.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if not line or line.startswith('['):
-                        continue
-                    
-                    # 简单的KRC解析
-                    time_match = re.search(r'\[(\d+),(\d+)\]', line)
-                    if time_match:
-                        start_time = int(time_match.group(1)) / 1000
-                        text = re.sub(r'\[\d+,\d+\]', '', line).strip()
-                        if text:
-                            lyrics.append(LyricLine(start_time, text))
+                # 简单的KRC解析
+                time_match = re.search(r'\[(\d+),(\d+)\]', line)
+                if time_match:
+                    start_time = int(time_match.group(1)) / 1000
+                    text = re.sub(r'\[\d+,\d+\]', '', line).strip()
+                    if text:
+                        yield start_time, text
         
         except Exception as e:
             logger.error(f"解析KRC文件失败: {e}")
-        
-        return sorted(lyrics, key=lambda x: x.time)
     
-    def parse_custom_file(self, file_path: str) -> List[LyricLine]:
-        """解析自定义格式文件"""
-        lyrics = []
-        
+    def _iter_custom(self, file_path: str) -> Iterator[Tuple[float, str]]:
+        """逐行解析自定义格式文件，产出(时间, 歌词文本)"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
+                for line in f:
                     line = line.strip()
                     if not line or line.startswith('#'):
                         continue
@@ -145,22 +213,20 @@ class SummaryGenerator:
                         time = self._parse_time_string(time_str)
                         text = line[time_match.end():].strip()
                         if text:
-                            lyrics.append(LyricLine(time, text))
+                            yield time, text
                         continue
                     
                     # 格式2: 时间 歌词
                     parts = line.split(' ', 1)
                     if len(parts) == 2:
                         time_str = parts[0]
-                        text = parts[1]
+                        text = parts[1].strip()
                         time = self._parse_time_string(time_str)
                         if time >= 0:
-                            lyrics.append(LyricLine(time, text))
+                            yield time, text
         
         except Exception as e:
             logger.error(f"解析自定义文件失败: {e}")
-        
-        return sorted(lyrics, key=lambda x: x.time)
     
     def _parse_time_string(self, time_str: str) -> float:
         """解析时间字符串"""
@@ -180,9 +246,8 @@ class SummaryGenerator:
     def is_shareable_quote(self, text: str) -> bool:
         """判断是否适合分享的经典歌词"""
         # 过滤掉包含避免词汇的歌词
-        for avoid_word in self.avoid_words:
-            if avoid_word in text:
-                return False
+        if self._pat_avoid.search(text):
+            return False
         
         # 过滤掉太短或太长的歌词
         clean_text = re.sub(r'[^\u4e00-\u9fff]', '', text)
@@ -294,12 +359,13 @@ class SummaryGenerator:
     
     def generate_summary(self, lyrics: List[LyricLine], song_name: str) -> str:
         """生成适合分享的经典歌词"""
-        if not lyrics:
+        return self.generate_summary_from_texts([lyric.text for lyric in lyrics], song_name)
+    
+    def generate_summary_from_texts(self, lyric_texts: List[str], song_name: str) -> str:
+        """根据按时间排序的歌词文本生成适合分享的经典歌词"""
+        if not lyric_texts:
             return "继续努力，下次会更好！"
         
-        # 提取所有歌词文本
-        lyric_texts = [lyric.text for lyric in lyrics]
-        
         # 过滤出适合分享的歌词
         shareable_quotes = []
         for text in lyric_texts:
@@ -309,8 +375,7 @@ class SummaryGenerator:
         
         if not shareable_quotes:
             # 如果没有找到合适的，返回中间部分的歌词
-            middle_index = len(lyrics) // 2
-            return lyrics[middle_index].text
+            return lyric_texts[len(lyric_texts) // 2]
         
         # 按分数排序，返回最高分的
         shareable_quotes.sort(key=lambda x: x[1], reverse=True)
@@ -324,22 +389,18 @@ class SummaryGenerator:
         """处理歌词文件并生成分享歌词"""
         try:
             # 根据格式解析歌词
-            if format_type == LyricFormat.LRC:
-                lyrics = self.parse_lrc_file(file_path)
-            elif format_type == LyricFormat.KRC:
-                lyrics = self.parse_krc_file(file_path)
-            elif format_type == LyricFormat.CUSTOM:
-                lyrics = self.parse_custom_file(file_path)
-            else:
+            if format_type not in (LyricFormat.LRC, LyricFormat.KRC, LyricFormat.CUSTOM):
                 logger.error(f"不支持的歌词格式: {format_type}")
                 return None
             
-            if not lyrics:
+            lyric_texts = self.parse_lyric_texts(file_path, format_type)
+            
+            if not lyric_texts:
                 logger.warning(f"未解析到歌词内容: {file_path}")
                 return "继续努力，下次会更好！"
             
             # 生成分享歌词
-            share_quote = self.generate_summary(lyrics, song_name)
+            share_quote = self.generate_summary_from_texts(lyric_texts, song_name)
             logger.info(f"生成分享歌词成功: {song_name} -> {share_quote}")
             
             return share_quote
@@ -350,32 +411,66 @@ class SummaryGenerator:
     
     def generate_csv(self, 
                     lyric_files: List[tuple], 
-                    output_path: str):
-        """批量处理歌词文件并生成CSV"""
-        results = []
+                    output_path: str,
+                    processes: Optional[int] = None):
+        """批量处理歌词文件并生成CSV
         
-        for file_path, song_id, song_name, format_type in lyric_files:
-            logger.info(f"处理文件: {file_path}")
-            
-            share_quote = self.process_lyric_file(file_path, song_id, song_name, format_type)
-            if share_quote:
-                results.append({
-                    'id': song_id,
-                    'song_name': song_name,
-                    'summary': share_quote
-                })
+        结果逐条返回并立即写入CSV，内存占用与批量大小无关；
+        文件较少时直接在当前进程处理，否则由进程池处理，工作进程沿用本实例的配置
+        """
+        count = 0
+        pool = None
         
-        # 写入CSV文件
         try:
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['id', 'song_name', 'summary'])
-                writer.writeheader()
-                writer.writerows(results)
+            if len(lyric_files) <= _INLINE_MAX_FILES:
+                records = (_summarize(self, item) for item in lyric_files)
+            else:
+                pool = Pool(processes, initializer=_init_worker, initargs=(self,))
+                records = pool.imap(_process_one, lyric_files, chunksize=32)
+            
+            with open(output_path, 'w', newline='', encoding='utf-8',
+                      buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(('id', 'song_name', 'summary'))
+                
+                for record in records:
+                    if record:
+                        writer.writerow(record)
+                        count += 1
             
-            logger.info(f"CSV文件生成成功: {output_path}, 共处理 {len(results)} 首歌曲")
+            logger.info(f"CSV文件生成成功: {output_path}, 共处理 {count} 首歌曲")
             
         except Exception as e:
             logger.error(f"生成CSV文件失败: {e}")
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+
+# 工作进程内的生成器实例
+_worker_generator: Optional[SummaryGenerator] = None
+
+
+def _init_worker(generator: SummaryGenerator):
+    """初始化工作进程，使用主进程传入的生成器实例"""
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _process_one(item: tuple) -> Optional[Tuple[str, str, str]]:
+    """在工作进程中处理单个歌词文件，返回CSV行"""
+    return _summarize(_worker_generator, item)
+
+
+def _summarize(generator: SummaryGenerator, item: tuple) -> Optional[Tuple[str, str, str]]:
+    """用指定生成器处理单个歌词文件，返回CSV行"""
+    file_path, song_id, song_name, format_type = item
+    logger.info(f"处理文件: {file_path}")
+    
+    share_quote = generator.process_lyric_file(file_path, song_id, song_name, format_type)
+    if share_quote:
+        return (song_id, song_name, share_quote)
+    return None
 
 
 # 使用示例
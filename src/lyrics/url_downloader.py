@@ -10,28 +10,158 @@
 """
 
 import os
+import json
+import functools
+import errno
+import shutil
+import time
+import asyncio
+import socket
+import threading
 import requests
 import logging
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from typing import Deque, Dict, Optional, Tuple
 from urllib.parse import urlparse
-import time
 
 logger = logging.getLogger(__name__)
 
+# 开启TCP keep-alive探测，及时发现并重建失效的长连接
+_KEEPALIVE_SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, 'TCP_KEEPIDLE'):
+    _KEEPALIVE_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60))
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """为连接池设置TCP keep-alive选项的HTTPAdapter"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + _KEEPALIVE_SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _build_retry(total: int) -> Retry:
+    """带抖动退避的重试策略，旧版urllib3不支持抖动时退化为普通退避"""
+    options = dict(
+        total=total,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+    )
+    try:
+        return Retry(backoff_jitter=0.2, **options)
+    except TypeError:
+        return Retry(**options)
+
+
+# Content-Type -> 文件扩展名
+_EXT_BY_CT = {
+    'application/x-lrc': '.lrc',
+    'application/lrc': '.lrc',
+    'text/lrc': '.lrc',
+    'text/x-lrc': '.lrc',
+    'application/x-krc': '.krc',
+    'application/krc': '.krc',
+    'text/krc': '.krc',
+    'text/x-krc': '.krc',
+    'text/plain': '.txt',
+}
+
+# copy_file_range不可用时回退到普通复制的错误码
+_COPY_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+
+@functools.lru_cache(maxsize=1024)
+def _url_ext(url: str) -> str:
+    """URL路径部分的文件扩展名"""
+    return os.path.splitext(urlparse(url).path)[1]
+
+
+@functools.lru_cache(maxsize=1024)
+def _url_host(url: str) -> str:
+    """URL的主机部分，本地路径返回空字符串"""
+    return urlparse(url).netloc
+
+
+@functools.lru_cache(maxsize=1024)
+def _path_ext(path: str) -> str:
+    """本地路径的文件扩展名"""
+    return os.path.splitext(path)[1]
+
+
+def _fsync_dir(path: str):
+    """将目录项（新建/重命名的文件）刷写到磁盘，不支持的平台上忽略"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError as e:
+        logger.warning(f"同步目录失败: {path}, 错误: {e}")
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.warning(f"同步目录失败: {path}, 错误: {e}")
+    finally:
+        os.close(fd)
+
+
+def _copy_file(src: str, dst: str):
+    """复制文件内容并保留元数据，Linux下由内核直接完成数据拷贝"""
+    if hasattr(os, 'copy_file_range'):
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            src_fd = fsrc.fileno()
+            dst_fd = fdst.fileno()
+            copied = 0
+            try:
+                while True:
+                    n = os.copy_file_range(src_fd, dst_fd, 1 << 30)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError as e:
+                if copied or e.errno not in _COPY_FALLBACK_ERRNOS:
+                    raise
+                shutil.copyfileobj(fsrc, fdst)
+    else:
+        shutil.copyfile(src, dst)
+    
+    shutil.copystat(src, dst)
+
 
 class LyricDownloader:
     """歌词文件下载器"""
     
-    def __init__(self, download_dir: str = "temp_lyrics", timeout: int = 30):
+    def __init__(self, download_dir: str = "temp_lyrics", timeout: int = 30,
+                 rate: Tuple[int, float] = (1, 1.0), concurrency: int = 8,
+                 max_per_host: int = 4, max_retries: int = 5, pool_size: int = 32):
         """
         初始化下载器
         
         Args:
             download_dir: 下载文件保存目录
             timeout: 下载超时时间（秒）
+            rate: 同一主机的限速 (请求数, 时间窗口秒数)，避免请求过于频繁
+            concurrency: 批量下载的最大并发数
+            max_per_host: 同一主机同时进行的最大请求数
+            max_retries: 连接失败或服务端错误时的最大重试次数
+            pool_size: 每个主机连接池保留的最大连接数
         """
         self.download_dir = download_dir
         self.timeout = timeout
+        self.rate = rate
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        
+        # 每个主机在时间窗口内已占用的请求时间点，以及并发请求信号量
+        self._buckets: Dict[str, Deque[float]] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._rate_lock = threading.Lock()
         
         # 创建下载目录
         os.makedirs(download_dir, exist_ok=True)
@@ -41,6 +171,17 @@ class LyricDownloader:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
+        # 复用连接的会话，避免每次请求重新握手
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = _KeepAliveAdapter(
+            pool_connections=16,
+            pool_maxsize=pool_size,
+            max_retries=_build_retry(max_retries)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         logger.info(f"歌词下载器初始化完成，下载目录: {download_dir}")
     
     def download_lyric_file(self, url: str, song_id: str) -> Optional[str]:
@@ -71,7 +212,7 @@ class LyricDownloader:
         """复制本地文件到下载目录"""
         try:
             # 确定文件扩展名
-            file_extension = os.path.splitext(file_path)[1]
+            file_extension = _path_ext(file_path)
             if not file_extension:
                 file_extension = '.txt'
             
@@ -79,9 +220,12 @@ class LyricDownloader:
             filename = f"{song_id}{file_extension}"
             target_path = os.path.join(self.download_dir, filename)
             
+            # 源文件已在下载目录中，无需复制
+            if os.path.exists(target_path) and os.path.samefile(file_path, target_path):
+                return target_path
+            
             # 复制文件
-            import shutil
-            shutil.copy2(file_path, target_path)
+            _copy_file(file_path, target_path)
             
             logger.info(f"复制成功: {file_path} -> {target_path}")
             return target_path
@@ -93,33 +237,59 @@ class LyricDownloader:
     def _download_from_url(self, url: str, song_id: str) -> Optional[str]:
         """从URL下载文件"""
         try:
-            # 发送请求
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            # 确定文件扩展名
-            parsed_url = urlparse(url)
-            file_extension = os.path.splitext(parsed_url.path)[1]
-            
-            # 如果没有扩展名，尝试从Content-Type推断
-            if not file_extension:
-                content_type = response.headers.get('content-type', '').lower()
-                if 'lrc' in content_type:
-                    file_extension = '.lrc'
-                elif 'krc' in content_type:
-                    file_extension = '.krc'
-                elif 'text' in content_type:
-                    file_extension = '.txt'
-                else:
-                    file_extension = '.txt'  # 默认使用txt
+            # 之前下载过同一URL时发送条件请求
+            meta = self._load_meta(song_id, url)
+            headers = {}
+            if meta:
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
             
-            # 生成文件名
-            filename = f"{song_id}{file_extension}"
-            file_path = os.path.join(self.download_dir, filename)
-            
-            # 保存文件
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
+            # 发送请求，响应体按块流式写入磁盘
+            with self._host_slot(url):
+                self._wait_for_rate_limit(url)
+                with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    if response.status_code == 304 and meta:
+                        logger.info(f"文件未修改，使用缓存: {meta['file_path']}")
+                        return meta['file_path']
+                    
+                    response.raise_for_status()
+                    
+                    # 确定文件扩展名
+                    file_extension = _url_ext(url)
+                    
+                    # 如果没有扩展名，尝试从Content-Type推断
+                    if not file_extension:
+                        content_type = response.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+                        file_extension = _EXT_BY_CT.get(content_type, '.txt')  # 默认使用txt
+                    
+                    # 生成文件名
+                    filename = f"{song_id}{file_extension}"
+                    file_path = os.path.join(self.download_dir, filename)
+                    
+                    # 先写入临时文件，完整下载后再原子替换，避免留下不完整的文件
+                    tmp_path = file_path + '.part'
+                    try:
+                        with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                            for chunk in response.iter_content(chunk_size=64 * 1024):
+                                if chunk:
+                                    f.write(chunk)
+                        os.replace(tmp_path, file_path)
+                    except BaseException:
+                        try:
+                            os.unlink(tmp_path)
+                        except OSError:
+                            pass
+                        raise
+                    
+                    self._save_meta(song_id, {
+                        'url': url,
+                        'file_path': file_path,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'content_length': response.headers.get('Content-Length'),
+                    })
             
             logger.info(f"下载成功: {file_path}")
             return file_path
@@ -131,43 +301,161 @@ class LyricDownloader:
             logger.error(f"保存文件失败: {url}, 错误: {e}")
             return None
     
-    def download_multiple_files(self, url_list: list, delay: float = 1.0) -> dict:
+    def _meta_path(self, song_id: str) -> str:
+        """缓存元数据文件路径"""
+        return os.path.join(self.download_dir, f"{song_id}.meta.json")
+    
+    def _load_meta(self, song_id: str, url: str) -> Optional[dict]:
+        """读取同一URL的缓存元数据，缓存文件不存在时返回None"""
+        try:
+            with open(self._meta_path(song_id), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if meta.get('url') != url or not os.path.isfile(meta.get('file_path', '')):
+            return None
+        return meta
+    
+    def _save_meta(self, song_id: str, meta: dict):
+        """保存缓存元数据，没有校验信息时不保存"""
+        if not meta.get('etag') and not meta.get('last_modified'):
+            return
+        
+        try:
+            with open(self._meta_path(song_id), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"保存缓存元数据失败: {song_id}, 错误: {e}")
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """获取主机的并发请求信号量"""
+        host = _url_host(url)
+        with self._rate_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+    
+    def _wait_for_rate_limit(self, url: str):
+        """按主机限速，只有同一主机的请求才需要等待"""
+        host = _url_host(url)
+        max_requests, window = self.rate
+        
+        with self._rate_lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(host, deque())
+            while bucket and now - bucket[0] >= window:
+                bucket.popleft()
+            
+            # 窗口已满时，预约最早可用的时间点
+            if len(bucket) >= max_requests:
+                start = bucket[-max_requests] + window
+            else:
+                start = now
+            bucket.append(start)
+        
+        if start > now:
+            time.sleep(start - now)
+    
+    def download_multiple_files(self, url_list: list, concurrency: Optional[int] = None) -> dict:
         """
         批量下载多个文件
         
+        下载在线程池中并行进行，同一主机的请求按rate限速
+        
         Args:
             url_list: URL列表，每个元素为(song_id, url)元组
-            delay: 下载间隔时间（秒），避免请求过于频繁
+            concurrency: 最大并发下载数，默认使用初始化时的设置
             
         Returns:
             下载结果字典，key为song_id，value为文件路径或None
         """
-        results = {}
+        results = {song_id: None for song_id, _ in url_list}
+        total = len(url_list)
+        
+        with ThreadPoolExecutor(max_workers=concurrency or self.concurrency) as executor:
+            future_map = {
+                executor.submit(self.download_lyric_file, url, song_id): song_id
+                for song_id, url in url_list
+            }
+            for done, future in enumerate(as_completed(future_map), 1):
+                song_id = future_map[future]
+                results[song_id] = future.result()
+                logger.info(f"下载进度: {done}/{total} - {song_id}")
+        
+        self._finish_batch(results)
+        return results
+    
+    async def adownload_multiple_files(self, url_list: list, concurrency: Optional[int] = None) -> dict:
+        """
+        并发批量下载多个文件（协程版本）
+        
+        不同主机的下载并行进行，同一主机的请求按rate限速
         
-        for i, (song_id, url) in enumerate(url_list):
-            logger.info(f"下载进度: {i+1}/{len(url_list)} - {song_id}")
+        Args:
+            url_list: URL列表，每个元素为(song_id, url)元组
+            concurrency: 最大并发下载数，默认使用初始化时的设置
             
-            file_path = self.download_lyric_file(url, song_id)
-            results[song_id] = file_path
+        Returns:
+            下载结果字典，key为song_id，value为文件路径或None
+        """
+        concurrency = concurrency or self.concurrency
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        total = len(url_list)
+        done = 0
+        
+        async def _download(song_id: str, url: str) -> Tuple[str, Optional[str]]:
+            nonlocal done
+            async with semaphore:
+                file_path = await loop.run_in_executor(
+                    executor, self.download_lyric_file, url, song_id
+                )
             
-            # 添加延迟，避免请求过于频繁
-            if i < len(url_list) - 1:  # 最后一个不需要延迟
-                time.sleep(delay)
+            done += 1
+            logger.info(f"下载进度: {done}/{total} - {song_id}")
+            return song_id, file_path
         
-        success_count = sum(1 for path in results.values() if path is not None)
-        logger.info(f"批量下载完成: 成功 {success_count}/{len(url_list)} 个文件")
+        # requests会话在线程池中执行，阻塞的网络等待彼此重叠
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            pairs = await asyncio.gather(*(_download(song_id, url) for song_id, url in url_list))
+        finally:
+            executor.shutdown(wait=False)
         
+        results = dict(pairs)
+        self._finish_batch(results)
         return results
     
+    def _finish_batch(self, results: dict):
+        """批量下载收尾：同步目录并输出统计"""
+        # 整批下载完成后统一同步一次目录元数据，而不是逐个文件fsync
+        _fsync_dir(self.download_dir)
+        
+        success_count = sum(1 for path in results.values() if path is not None)
+        logger.info(f"批量下载完成: 成功 {success_count}/{len(results)} 个文件")
+    
+    def close(self):
+        """关闭HTTP会话，释放连接池"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
     def cleanup(self):
         """清理下载的临时文件"""
         try:
-            if os.path.exists(self.download_dir):
-                for filename in os.listdir(self.download_dir):
-                    file_path = os.path.join(self.download_dir, filename)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                logger.info(f"清理临时文件完成: {self.download_dir}")
+            with os.scandir(self.download_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        os.unlink(entry.path)
+            logger.info(f"清理临时文件完成: {self.download_dir}")
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"清理临时文件失败: {e}")
 
@@ -10,12 +10,68 @@
 """
 
 import logging
-from typing import Dict, Optional, Any
+import random
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
 from .summary_manager import SummaryManager, LyricSummary
 
 logger = logging.getLogger(__name__)
 
+# 按得分等级划分的分享文本模板
+_TEMPLATES: Dict[str, Tuple[str, ...]] = {
+    'excellent': (
+        "🎵 完美演绎《{name}》！得分：{score}分\n{text}",
+        "🌟 超棒表现！《{name}》得分：{score}分\n{text}",
+        "💫 惊艳演唱！《{name}》获得{score}分\n{text}",
+    ),
+    'good': (
+        "🎤 不错的表现！《{name}》得分：{score}分\n{text}",
+        "👍 唱得不错！《{name}》获得{score}分\n{text}",
+        "🎵 继续加油！《{name}》得分：{score}分\n{text}",
+    ),
+    'fair': (
+        "🎵 演唱《{name}》，得分：{score}分\n{text}",
+        "🎤 练习中！《{name}》获得{score}分\n{text}",
+        "💪 努力进步！《{name}》得分：{score}分\n{text}",
+    ),
+    'needs_improvement': (
+        "🎵 演唱《{name}》，还有进步空间\n{text}",
+        "🎤 继续练习！《{name}》得分：{score}分\n{text}",
+        "💪 加油！《{name}》还有提升空间\n{text}",
+    ),
+}
+
+_rng = random.Random()
+
+
+@dataclass(frozen=True)
+class PlatformConfig:
+    """社交平台分享配置"""
+    max_length: int
+    hashtags: bool
+    emoji: bool = True
+
+
+_PLATFORM_CFG: Dict[str, PlatformConfig] = {
+    'wechat': PlatformConfig(max_length=200, hashtags=False),
+    'weibo': PlatformConfig(max_length=140, hashtags=True),
+    'qq': PlatformConfig(max_length=300, hashtags=False),
+    'douyin': PlatformConfig(max_length=100, hashtags=True),
+}
+
+_HASHTAG_FMT = "\n#卡拉OK#{song}#{artist}"
+
+# 得分等级及其分数线（得分达到分数线即进入更高等级）
+_LEVELS = ("needs_improvement", "fair", "good", "excellent")
+_CUTS = (70, 80, 90)
+
+
+def _score_level(score: float) -> str:
+    """获取得分等级"""
+    return _LEVELS[bisect_right(_CUTS, score)]
+
 
 class ShareService:
     """分享服务"""
@@ -47,6 +103,9 @@ class ShareService:
         Returns:
             分享内容字典
         """
+        score_level = _score_level(performance_score)
+        now_iso = datetime.now().isoformat()
+        
         try:
             # 获取推荐摘要
             summary = self.summary_manager.get_recommended_summary(
@@ -55,7 +114,7 @@ class ShareService:
             
             if not summary:
                 # 如果没有找到摘要，使用默认内容
-                return self._get_default_share_content(performance_score)
+                return self._get_default_share_content(performance_score, score_level, now_iso)
             
             # 构建分享内容
             share_content = {
@@ -63,11 +122,11 @@ class ShareService:
                 'song_name': summary.song_name,
                 'artist': summary.artist,
                 'performance_score': performance_score,
-                'score_level': self._get_score_level(performance_score),
-                'share_text': self._generate_share_text(summary, performance_score),
+                'score_level': score_level,
+                'share_text': self._generate_share_text(summary, performance_score, score_level),
                 'emotion_tags': summary.emotion_tags,
                 'summary_type': summary.summary_type.value,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso,
                 'user_id': user_id
             }
             
@@ -76,61 +135,25 @@ class ShareService:
             
         except Exception as e:
             logger.error(f"获取分享内容失败: {e}")
-            return self._get_default_share_content(performance_score)
-    
-    def _get_score_level(self, score: float) -> str:
-        """获取得分等级"""
-        if score >= 90:
-            return "excellent"
-        elif score >= 80:
-            return "good"
-        elif score >= 70:
-            return "fair"
-        else:
-            return "needs_improvement"
+            return self._get_default_share_content(performance_score, score_level, now_iso)
     
-    def _generate_share_text(self, summary: LyricSummary, score: float) -> str:
+    def _generate_share_text(self, summary: LyricSummary, score: float, score_level: str) -> str:
         """生成分享文本"""
-        score_level = self._get_score_level(score)
-        
-        templates = {
-            'excellent': [
-                f"🎵 完美演绎《{summary.song_name}》！得分：{score}分\n{summary.summary_text}",
-                f"🌟 超棒表现！《{summary.song_name}》得分：{score}分\n{summary.summary_text}",
-                f"💫 惊艳演唱！《{summary.song_name}》获得{score}分\n{summary.summary_text}"
-            ],
-            'good': [
-                f"🎤 不错的表现！《{summary.song_name}》得分：{score}分\n{summary.summary_text}",
-                f"👍 唱得不错！《{summary.song_name}》获得{score}分\n{summary.summary_text}",
-                f"🎵 继续加油！《{summary.song_name}》得分：{score}分\n{summary.summary_text}"
-            ],
-            'fair': [
-                f"🎵 演唱《{summary.song_name}》，得分：{score}分\n{summary.summary_text}",
-                f"🎤 练习中！《{summary.song_name}》获得{score}分\n{summary.summary_text}",
-                f"💪 努力进步！《{summary.song_name}》得分：{score}分\n{summary.summary_text}"
-            ],
-            'needs_improvement': [
-                f"🎵 演唱《{summary.song_name}》，还有进步空间\n{summary.summary_text}",
-                f"🎤 继续练习！《{summary.song_name}》得分：{score}分\n{summary.summary_text}",
-                f"💪 加油！《{summary.song_name}》还有提升空间\n{summary.summary_text}"
-            ]
-        }
-        
-        import random
-        return random.choice(templates[score_level])
+        template = _rng.choice(_TEMPLATES[score_level])
+        return template.format(name=summary.song_name, score=score, text=summary.summary_text)
     
-    def _get_default_share_content(self, score: float) -> Dict[str, Any]:
+    def _get_default_share_content(self, score: float, score_level: str, now_iso: str) -> Dict[str, Any]:
         """获取默认分享内容"""
         return {
             'summary_text': "继续努力，下次会更好！",
             'song_name': "未知歌曲",
             'artist': "未知歌手",
             'performance_score': score,
-            'score_level': self._get_score_level(score),
+            'score_level': score_level,
             'share_text': f"🎵 卡拉OK演唱，得分：{score}分\n继续努力，下次会更好！",
             'emotion_tags': ["鼓励"],
             'summary_type': "default",
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso
         }
     
     def share_to_social_platform(self, 
@@ -164,42 +187,18 @@ class ShareService:
                            content: Dict[str, Any], 
                            platform: str) -> Dict[str, Any]:
         """根据平台调整内容格式"""
-        base_content = content.copy()
-        
-        platform_configs = {
-            'wechat': {
-                'max_length': 200,
-                'hashtags': False,
-                'emoji': True
-            },
-            'weibo': {
-                'max_length': 140,
-                'hashtags': True,
-                'emoji': True
-            },
-            'qq': {
-                'max_length': 300,
-                'hashtags': False,
-                'emoji': True
-            },
-            'douyin': {
-                'max_length': 100,
-                'hashtags': True,
-                'emoji': True
-            }
-        }
-        
-        config = platform_configs.get(platform, platform_configs['wechat'])
+        config = _PLATFORM_CFG.get(platform, _PLATFORM_CFG['wechat'])
         
         # 调整文本长度
-        if len(base_content['share_text']) > config['max_length']:
-            base_content['share_text'] = base_content['share_text'][:config['max_length']-3] + "..."
+        text = content['share_text']
+        if len(text) > config.max_length:
+            text = text[:config.max_length - 3] + "..."
         
         # 添加话题标签
-        if config['hashtags']:
-            base_content['share_text'] += f"\n#卡拉OK#{base_content['song_name']}#{base_content['artist']}"
+        if config.hashtags:
+            text += _HASHTAG_FMT.format(song=content['song_name'], artist=content['artist'])
         
-        return base_content
+        return {**content, 'share_text': text}
     
     def get_share_statistics(self, user_id: str) -> Dict[str, Any]:
         """
@@ -9,11 +9,15 @@
 版本: 1.0.0
 """
 
+import heapq
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set, Tuple, Any
 from datetime import datetime
 import json
 from enum import Enum
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +37,27 @@ class DifficultyLevel(Enum):
     HARD = "hard"
 
 
+# 枚举成员 -> 整数编码，用于推荐筛选时的快速比较
+_TYPE_CODE = {t: i for i, t in enumerate(SummaryType)}
+_DIFFICULTY_CODE = {d: i for i, d in enumerate(DifficultyLevel)}
+
+# 内存中维护的热门摘要数量上限
+_TOPK_MAX = 100
+
+# 搜索索引的最大n元组长度
+_SHINGLE_SIZE = 3
+
+
 class LyricSummary:
     """歌词摘要数据模型"""
     
+    __slots__ = (
+        'summary_id', 'song_id', 'song_name', 'artist', 'summary_text',
+        '_summary_type', 'summary_score', 'start_time', 'end_time',
+        'lyric_context', 'emotion_tags', '_difficulty_level',
+        'popularity_score', 'is_active', '_type_code', '_difficulty_code'
+    )
+    
     def __init__(self, 
                  summary_id: int,
                  song_id: str,
@@ -67,6 +89,26 @@ class LyricSummary:
         self.popularity_score = popularity_score
         self.is_active = is_active
     
+    # 类型和难度同时保存整数编码，推荐筛选时比较整数而不是枚举；
+    # 通过属性赋值，保证修改后编码同步更新
+    @property
+    def summary_type(self) -> SummaryType:
+        return self._summary_type
+    
+    @summary_type.setter
+    def summary_type(self, value: SummaryType):
+        self._type_code = _TYPE_CODE[value]
+        self._summary_type = value
+    
+    @property
+    def difficulty_level(self) -> DifficultyLevel:
+        return self._difficulty_level
+    
+    @difficulty_level.setter
+    def difficulty_level(self, value: DifficultyLevel):
+        self._difficulty_code = _DIFFICULTY_CODE[value]
+        self._difficulty_level = value
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
         return {
@@ -110,16 +152,48 @@ class LyricSummary:
 class SummaryManager:
     """摘要管理器"""
     
-    def __init__(self, db_connection=None):
+    def __init__(self, db_connection=None, cache_size: int = 4096):
         """
         初始化摘要管理器
         
         Args:
             db_connection: 数据库连接对象
+            cache_size: 按歌曲缓存摘要的最大歌曲数
         """
         self.db = db_connection
+        
+        # 歌曲ID -> 摘要元组的LRU缓存，热门歌曲无需重复查询数据库
+        self._summary_cache: "OrderedDict[str, Tuple[LyricSummary, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        
+        # 热门摘要的小顶堆 (popularity_score, summary_id)，首次查询时从数据库加载
+        # 每个摘要ID在堆中只出现一次，摘要对象单独保存，堆比较时不会比较到摘要对象
+        self._topk: List[Tuple[float, int]] = []
+        self._topk_items: Dict[int, LyricSummary] = {}
+        self._topk_loaded = False
+        self._topk_lock = threading.Lock()
+        
+        # 搜索用的n元组倒排索引，首次搜索时建立
+        self._search_docs: List[LyricSummary] = []
+        self._search_index: Optional[Dict[str, Set[int]]] = None
+        
         logger.info("摘要管理器初始化完成")
     
+    def invalidate(self, song_id: Optional[str] = None):
+        """
+        使摘要缓存失效，搜索索引会在下次搜索时重建
+        
+        Args:
+            song_id: 歌曲ID，为None时清空全部缓存
+        """
+        self._search_index = None
+        with self._cache_lock:
+            if song_id is None:
+                self._summary_cache.clear()
+            else:
+                self._summary_cache.pop(song_id, None)
+    
     def get_summary_by_id(self, summary_id: int) -> Optional[LyricSummary]:
         """
         根据ID获取摘要
@@ -165,42 +239,58 @@ class SummaryManager:
         Returns:
             摘要列表
         """
+        with self._cache_lock:
+            cached = self._summary_cache.get(song_id)
+            if cached is not None:
+                self._summary_cache.move_to_end(song_id)
+                return list(cached)
+        
         try:
-            # TODO: 实现数据库查询
-            # query = "SELECT * FROM lyric_summaries WHERE song_id = %s AND is_active = TRUE ORDER BY popularity_score DESC"
-            # results = self.db.execute(query, (song_id,))
-            
-            # 模拟数据
-            if song_id == "song_001":
-                return [
-                    LyricSummary(
-                        summary_id=1,
-                        song_id="song_001",
-                        song_name="朋友",
-                        artist="周华健",
-                        summary_text="朋友一生一起走，那些日子不再有",
-                        summary_type=SummaryType.EMOTIONAL,
-                        summary_score=9.5,
-                        emotion_tags=["友情", "回忆", "温暖"],
-                        popularity_score=8.9
-                    ),
-                    LyricSummary(
-                        summary_id=2,
-                        song_id="song_001",
-                        song_name="朋友",
-                        artist="周华健",
-                        summary_text="一句话，一辈子，一生情，一杯酒",
-                        summary_type=SummaryType.STRUCTURAL,
-                        summary_score=8.8,
-                        emotion_tags=["友情", "承诺", "深情"],
-                        popularity_score=8.7
-                    )
-                ]
-            return []
-            
+            summaries = tuple(self._query_summaries_by_song(song_id))
         except Exception as e:
             logger.error(f"获取歌曲摘要失败: {e}")
             return []
+        
+        with self._cache_lock:
+            self._summary_cache[song_id] = summaries
+            if len(self._summary_cache) > self._cache_size:
+                self._summary_cache.popitem(last=False)
+        
+        return list(summaries)
+    
+    def _query_summaries_by_song(self, song_id: str) -> List[LyricSummary]:
+        """从数据库查询歌曲的所有摘要"""
+        # TODO: 实现数据库查询
+        # query = "SELECT * FROM lyric_summaries WHERE song_id = %s AND is_active = TRUE ORDER BY popularity_score DESC"
+        # results = self.db.execute(query, (song_id,))
+        
+        # 模拟数据
+        if song_id == "song_001":
+            return [
+                LyricSummary(
+                    summary_id=1,
+                    song_id="song_001",
+                    song_name="朋友",
+                    artist="周华健",
+                    summary_text="朋友一生一起走，那些日子不再有",
+                    summary_type=SummaryType.EMOTIONAL,
+                    summary_score=9.5,
+                    emotion_tags=["友情", "回忆", "温暖"],
+                    popularity_score=8.9
+                ),
+                LyricSummary(
+                    summary_id=2,
+                    song_id="song_001",
+                    song_name="朋友",
+                    artist="周华健",
+                    summary_text="一句话，一辈子，一生情，一杯酒",
+                    summary_type=SummaryType.STRUCTURAL,
+                    summary_score=8.8,
+                    emotion_tags=["友情", "承诺", "深情"],
+                    popularity_score=8.7
+                )
+            ]
+        return []
     
     def get_recommended_summary(self, 
                               song_id: str, 
@@ -243,26 +333,73 @@ class SummaryManager:
             logger.error(f"获取推荐摘要失败: {e}")
             return None
     
+    def batch_get_recommended(self,
+                              song_ids: List[str],
+                              scores: np.ndarray) -> List[Optional[LyricSummary]]:
+        """
+        批量获取推荐摘要，选择规则与get_recommended_summary一致
+        
+        每首歌的候选摘要只转换为列数组一次，同一首歌的多个请求共享结果
+        
+        Args:
+            song_ids: 歌曲ID列表
+            scores: 与song_ids一一对应的演唱得分
+            
+        Returns:
+            推荐摘要列表，没有摘要的歌曲对应None
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        results: List[Optional[LyricSummary]] = [None] * len(song_ids)
+        
+        # 按歌曲分组请求位置
+        positions: Dict[str, List[int]] = {}
+        for i, song_id in enumerate(song_ids):
+            positions.setdefault(song_id, []).append(i)
+        
+        for song_id, indexes in positions.items():
+            summaries = self.get_summaries_by_song(song_id)
+            if not summaries:
+                continue
+            
+            n = len(summaries)
+            type_col = np.fromiter((s._type_code for s in summaries), dtype=np.int8, count=n)
+            difficulty_col = np.fromiter((s._difficulty_code for s in summaries), dtype=np.int8, count=n)
+            popularity_col = np.fromiter((s.popularity_score for s in summaries), dtype=np.float64, count=n)
+            score_col = np.fromiter((s.summary_score for s in summaries), dtype=np.float64, count=n)
+            
+            # 各得分段的候选，找不到时选择最受欢迎的
+            most_popular = int(popularity_col.argmax())
+            emotional = _masked_argmax(score_col, type_col == _TYPE_CODE[SummaryType.EMOTIONAL], most_popular)
+            structural = _masked_argmax(popularity_col, type_col == _TYPE_CODE[SummaryType.STRUCTURAL], most_popular)
+            easy = _masked_argmax(popularity_col, difficulty_col == _DIFFICULTY_CODE[DifficultyLevel.EASY], most_popular)
+            
+            song_scores = scores[indexes]
+            chosen = np.select([song_scores >= 90, song_scores >= 70], [emotional, structural], easy)
+            for position, choice in zip(indexes, chosen.tolist()):
+                results[position] = summaries[choice]
+        
+        return results
+    
     def _select_by_emotion(self, summaries: List[LyricSummary], emotion_type: str) -> Optional[LyricSummary]:
         """根据情感类型选择摘要"""
-        emotional_summaries = [s for s in summaries if s.summary_type.value == emotion_type]
-        if emotional_summaries:
-            return max(emotional_summaries, key=lambda x: x.summary_score)
-        return None
+        try:
+            code = _TYPE_CODE[SummaryType(emotion_type)]
+        except ValueError:
+            return None
+        return max((s for s in summaries if s._type_code == code),
+                   key=lambda x: x.summary_score, default=None)
     
     def _select_by_type(self, summaries: List[LyricSummary], summary_type: SummaryType) -> Optional[LyricSummary]:
         """根据摘要类型选择"""
-        type_summaries = [s for s in summaries if s.summary_type == summary_type]
-        if type_summaries:
-            return max(type_summaries, key=lambda x: x.popularity_score)
-        return None
+        code = _TYPE_CODE[summary_type]
+        return max((s for s in summaries if s._type_code == code),
+                   key=lambda x: x.popularity_score, default=None)
     
     def _select_by_difficulty(self, summaries: List[LyricSummary], difficulty: DifficultyLevel) -> Optional[LyricSummary]:
         """根据难度等级选择摘要"""
-        difficulty_summaries = [s for s in summaries if s.difficulty_level == difficulty]
-        if difficulty_summaries:
-            return max(difficulty_summaries, key=lambda x: x.popularity_score)
-        return None
+        code = _DIFFICULTY_CODE[difficulty]
+        return max((s for s in summaries if s._difficulty_code == code),
+                   key=lambda x: x.popularity_score, default=None)
     
     def add_summary(self, summary: LyricSummary) -> bool:
         """
@@ -284,6 +421,12 @@ class SummaryManager:
             # """
             # self.db.execute(query, (...))
             
+            self.invalidate(summary.song_id)
+            if summary.is_active:
+                with self._topk_lock:
+                    # 尚未加载时不入堆，首次查询会从数据库一并加载
+                    if self._topk_loaded:
+                        self._push_topk(summary.popularity_score, summary)
             logger.info(f"添加摘要成功: {summary.summary_text}")
             return True
             
@@ -307,6 +450,9 @@ class SummaryManager:
             # query = "UPDATE lyric_summaries SET ... WHERE id = %s"
             # self.db.execute(query, (...))
             
+            # 只知道摘要ID，无法定位歌曲，清空全部缓存
+            self.invalidate()
+            self._update_topk(summary_id, updates)
             logger.info(f"更新摘要成功: {summary_id}")
             return True
             
@@ -329,6 +475,8 @@ class SummaryManager:
             # query = "UPDATE lyric_summaries SET is_active = FALSE WHERE id = %s"
             # self.db.execute(query, (summary_id,))
             
+            self.invalidate()
+            self._update_topk(summary_id, {'is_active': False})
             logger.info(f"删除摘要成功: {summary_id}")
             return True
             
@@ -347,32 +495,107 @@ class SummaryManager:
             热门摘要列表
         """
         try:
-            # TODO: 实现数据库查询
-            # query = """
-            #     SELECT * FROM lyric_summaries 
-            #     WHERE is_active = TRUE 
-            #     ORDER BY popularity_score DESC 
-            #     LIMIT %s
-            # """
-            # results = self.db.execute(query, (limit,))
+            # 超出内存top-K范围时直接查询数据库
+            if limit > _TOPK_MAX:
+                return self._query_popular_summaries(limit)
             
-            # 模拟数据
-            return [
-                LyricSummary(
-                    summary_id=1,
-                    song_id="song_001",
-                    song_name="朋友",
-                    artist="周华健",
-                    summary_text="朋友一生一起走，那些日子不再有",
-                    summary_type=SummaryType.EMOTIONAL,
-                    popularity_score=8.9
-                )
-            ]
+            with self._topk_lock:
+                if not self._topk_loaded:
+                    for summary in self._query_popular_summaries(_TOPK_MAX):
+                        self._push_topk(summary.popularity_score, summary)
+                    self._topk_loaded = True
+                return [self._topk_items[summary_id]
+                        for _, summary_id in heapq.nlargest(limit, self._topk)]
             
         except Exception as e:
             logger.error(f"获取热门摘要失败: {e}")
             return []
     
+    def _push_topk(self, score: float, summary: LyricSummary):
+        """
+        将摘要加入热门堆，已存在时替换原条目，超过上限时淘汰最不热门的
+        
+        调用方需持有_topk_lock
+        """
+        summary_id = summary.summary_id
+        self._remove_topk(summary_id)
+        
+        entry = (score, summary_id)
+        if len(self._topk) < _TOPK_MAX:
+            heapq.heappush(self._topk, entry)
+        else:
+            evicted = heapq.heappushpop(self._topk, entry)
+            if evicted == entry:
+                return
+            del self._topk_items[evicted[1]]
+        self._topk_items[summary_id] = summary
+    
+    def _remove_topk(self, summary_id: int) -> Optional[float]:
+        """从热门堆中移除摘要，返回其热度，不在堆中时返回None（调用方需持有_topk_lock）"""
+        if summary_id not in self._topk_items:
+            return None
+        
+        for i, (score, entry_id) in enumerate(self._topk):
+            if entry_id == summary_id:
+                break
+        self._topk[i] = self._topk[-1]
+        self._topk.pop()
+        heapq.heapify(self._topk)
+        del self._topk_items[summary_id]
+        return score
+    
+    def _update_topk(self, summary_id: int, updates: Dict[str, Any]):
+        """
+        根据更新内容调整热门堆中对应的摘要
+        
+        仅堆内摘要热度上升时原地调整；其余情况（不在堆中、热度下降、停用）
+        堆外摘要可能进入前K名，清空堆，下次查询时从数据库重新加载
+        """
+        if 'popularity_score' not in updates and 'is_active' not in updates:
+            return
+        
+        with self._topk_lock:
+            if not self._topk_loaded:
+                return
+            
+            summary = self._topk_items.get(summary_id)
+            score = updates.get('popularity_score')
+            if (summary is not None and updates.get('is_active', True)
+                    and score is not None and score >= summary.popularity_score):
+                summary.popularity_score = score
+                self._push_topk(score, summary)
+                return
+            
+            if summary is not None and score is not None:
+                summary.popularity_score = score
+            self._topk.clear()
+            self._topk_items.clear()
+            self._topk_loaded = False
+    
+    def _query_popular_summaries(self, limit: int) -> List[LyricSummary]:
+        """从数据库查询热门摘要"""
+        # TODO: 实现数据库查询
+        # query = """
+        #     SELECT * FROM lyric_summaries 
+        #     WHERE is_active = TRUE 
+        #     ORDER BY popularity_score DESC 
+        #     LIMIT %s
+        # """
+        # results = self.db.execute(query, (limit,))
+        
+        # 模拟数据
+        return [
+            LyricSummary(
+                summary_id=1,
+                song_id="song_001",
+                song_name="朋友",
+                artist="周华健",
+                summary_text="朋友一生一起走，那些日子不再有",
+                summary_type=SummaryType.EMOTIONAL,
+                popularity_score=8.9
+            )
+        ]
+    
     def search_summaries(self, keyword: str, limit: int = 20) -> List[LyricSummary]:
         """
         搜索摘要
@@ -396,13 +619,65 @@ class SummaryManager:
             # search_term = f"%{keyword}%"
             # results = self.db.execute(query, (search_term, search_term, search_term, limit))
             
-            # 模拟搜索
-            summaries = self.get_popular_summaries(limit)
-            return [s for s in summaries if keyword in s.summary_text or keyword in s.song_name]
+            if self._search_index is None:
+                self._build_search_index()
+            docs = self._search_docs
+            index = self._search_index
+            
+            # 取关键词的所有n元组，求倒排表交集得到候选
+            term = keyword.lower()
+            n = min(_SHINGLE_SIZE, len(term))
+            if n == 0:
+                candidates = set(range(len(docs)))
+            else:
+                postings = [index.get(term[i:i + n], set()) for i in range(len(term) - n + 1)]
+                postings.sort(key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+            
+            # 关键词超过n元组长度时需逐条确认
+            matches = [docs[i] for i in candidates
+                       if any(term in field for field in _search_fields(docs[i]))]
+            matches.sort(key=lambda x: x.popularity_score, reverse=True)
+            return matches[:limit]
             
         except Exception as e:
             logger.error(f"搜索摘要失败: {e}")
             return []
+    
+    def _build_search_index(self):
+        """为所有有效摘要建立n元组倒排索引"""
+        docs = self._load_active_summaries()
+        index: Dict[str, Set[int]] = {}
+        
+        for doc_id, summary in enumerate(docs):
+            for field in _search_fields(summary):
+                for n in range(1, _SHINGLE_SIZE + 1):
+                    for i in range(len(field) - n + 1):
+                        index.setdefault(field[i:i + n], set()).add(doc_id)
+        
+        self._search_docs = docs
+        self._search_index = index
+    
+    def _load_active_summaries(self) -> List[LyricSummary]:
+        """加载所有有效摘要用于建立搜索索引"""
+        # TODO: 实现数据库查询
+        # query = "SELECT * FROM lyric_summaries WHERE is_active = TRUE"
+        # results = self.db.execute(query)
+        
+        # 模拟数据
+        return self.get_popular_summaries()
+
+
+def _search_fields(summary: LyricSummary) -> Tuple[str, str, str]:
+    """参与搜索的字段（小写）"""
+    return (summary.summary_text.lower(), summary.song_name.lower(), summary.artist.lower())
+
+
+def _masked_argmax(values: np.ndarray, mask: np.ndarray, default: int) -> int:
+    """返回mask为True的元素中最大值的下标，没有候选时返回default"""
+    if not mask.any():
+        return default
+    return int(np.where(mask, values, -np.inf).argmax())
 
 
 # 使用示例
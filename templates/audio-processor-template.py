@@ -9,16 +9,149 @@
 版本: 1.0.0
 """
 
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
-from pathlib import Path
+import struct
+import subprocess
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import Optional, List, Dict, Any, Tuple, Deque, Iterable, Iterator, ClassVar, Set, Union
 import os
 
+import numpy as np
+import soundfile as sf
+from scipy import fft as sp_fft
+from scipy.signal import resample_poly
+
+# 人声分离依赖torch和demucs，未安装时extract_vocals不可用
+try:
+    import torch
+    from demucs.apply import apply_model
+    from demucs.pretrained import get_model
+except ImportError:
+    torch = None
+
+# 安装numba时使用编译后的融合音效内核
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# libsndfile可直接读写的无损格式（无需经过ffmpeg）
+_LOSSLESS_FORMATS = {'wav': 'WAV', 'flac': 'FLAC'}
+
+# 读取PCM时使用的numpy类型，保证无损往返
+_SUBTYPE_DTYPES = {
+    'PCM_S8': 'int16',
+    'PCM_U8': 'int16',
+    'PCM_16': 'int16',
+    'PCM_24': 'int32',
+    'PCM_32': 'int32',
+    'FLOAT': 'float32',
+    'DOUBLE': 'float64',
+}
+
+# 有损编码器对应的输出扩展名
+_LOSSY_EXTENSIONS = {'vorbis': 'ogg', 'opus': 'opus', 'aac': 'aac', 'mp3': 'mp3'}
+
+# 输出扩展名对应的ffmpeg编码器，显式指定以免ffmpeg按容器默认值选择编码器
+_LOSSY_CODECS = {'ogg': 'libvorbis', 'opus': 'libopus', 'aac': 'aac', 'mp3': 'libmp3lame'}
+
+# 有损编码的音质与码率对应关系
+_LOSSY_BITRATES = {'low': '128k', 'medium': '192k', 'high': '320k'}
+
+# 融合音效内核的操作码
+_OP_GAIN = 0
+_OP_ECHO = 1
+
+# WAV格式码：PCM整数与WAVE_FORMAT_EXTENSIBLE
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# process_batch允许分发的单文件操作
+_BATCH_OPS = frozenset({'convert_format', 'extract_vocals', 'apply_effects', 'get_audio_info'})
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _apply_chain_kernel(block, opcodes, params, delays, lines, positions):
+        """
+        在一次遍历中对整块数据依次应用整条音效链（原地修改）
+        
+        lines为每个回声音效的环形延迟线，positions为本块起始时各延迟线的写入位置
+        """
+        frames, channels = block.shape
+        for c in prange(channels):
+            for t in range(frames):
+                value = block[t, c]
+                for k in range(opcodes.shape[0]):
+                    if opcodes[k] == _OP_GAIN:
+                        value *= params[k]
+                    else:
+                        index = (positions[k] + t) % delays[k]
+                        delayed = lines[k, index, c]
+                        lines[k, index, c] = value
+                        value += params[k] * delayed
+                block[t, c] = value
+
+
+def _derive_output(input_file: str, stem_suffix: str = '',
+                   new_ext: Optional[str] = None) -> str:
+    """
+    根据输入文件路径生成输出文件路径
+    
+    Args:
+        input_file: 输入文件路径
+        stem_suffix: 追加到文件名（不含扩展名）后的后缀，如"_vocals"
+        new_ext: 新扩展名（不含点），None表示沿用原扩展名
+    """
+    base, ext = os.path.splitext(input_file)
+    if new_ext:
+        ext = f'.{new_ext}'
+    return f"{base}{stem_suffix}{ext}"
+
+
+@lru_cache(maxsize=4096)
+def _audio_info_impl(audio_file: str, mtime_ns: int, file_size: int) -> Dict[str, Any]:
+    """
+    读取音频文件头信息
+    
+    以(路径, 修改时间, 文件大小)作为缓存键，文件变化后自动失效
+    """
+    info = {
+        'file_path': audio_file,
+        'file_size': file_size,
+        'format': 'unknown',
+        'duration': 0.0,
+        'sample_rate': 0,
+        'channels': 0,
+        'bitrate': 0
+    }
+    
+    try:
+        sf_info = sf.info(audio_file)
+    except RuntimeError as e:
+        # libsndfile无法识别的格式只返回文件级信息
+        logger.warning("无法解析音频头信息: %s, 错误: %s", audio_file, e)
+        return info
+    
+    info['format'] = sf_info.format.lower()
+    info['duration'] = sf_info.duration
+    info['sample_rate'] = sf_info.samplerate
+    info['channels'] = sf_info.channels
+    if sf_info.duration > 0:
+        info['bitrate'] = int(file_size * 8 / sf_info.duration)
+    return info
+
+
 class AudioProcessingError(Exception):
     """音频处理错误基类"""
     pass
@@ -46,6 +179,17 @@ class AudioProcessor:
         "output.mp3"
     """
     
+    __slots__ = (
+        'config', 'supported_formats', 'cache', 'device',
+        '_cache_bytes', '_cache_bytes_max', '_cache_lock',
+        '_scratch', '_separator', '_io_executor',
+        '_buffer_pool', '_pool_bytes', '_pool_lock', '_ir_cache',
+    )
+    
+    # 已确认存在的临时目录（绝对路径），同一进程内的实例共享
+    _ensured_temp_dirs: ClassVar[Set[str]] = set()
+    _temp_dir_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         初始化音频处理器
@@ -57,8 +201,31 @@ class AudioProcessor:
             AudioProcessingError: 初始化失败时抛出
         """
         self.config = config or self._get_default_config()
-        self.supported_formats = self.config.get('supported_formats', [])
-        self.cache = {}
+        self.supported_formats = frozenset(
+            fmt.lower() for fmt in self.config.get('supported_formats', [])
+        )
+        # 解码结果的LRU缓存，键为(路径, 修改时间, 文件大小)，值为(采样数组, 采样率)
+        self.cache: "OrderedDict[Tuple[str, int, int], Tuple[np.ndarray, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_bytes_max = self.config.get('cache_bytes', 256 * 1024 * 1024)
+        self._cache_lock = threading.Lock()
+        # 每个线程独立的工作区（乒乓缓冲区ring、FFT工作区fft_plans），
+        # 异步接口在线程池中并发调用apply_effects时互不干扰
+        self._scratch = threading.local()
+        self._separator = None
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        # 解码缓冲区池，键为(向上取整到2的幂的帧数, 声道数, 数据类型)
+        # 按最近归还顺序排列，超出buffer_pool_bytes时先淘汰最久未用的尺寸
+        self._buffer_pool: "OrderedDict[Tuple[int, int, str], Deque[np.ndarray]]" = OrderedDict()
+        self._pool_bytes = 0
+        # 分块后的冲激响应频谱，键为(来源, 采样率, 分块大小, 声道数)
+        self._ir_cache: Dict[Tuple[str, int, int, int], np.ndarray] = {}
+        self._pool_lock = threading.Lock()
+        self.device = None
+        if torch is not None:
+            self.device = torch.device(
+                self.config.get('device') or ('cuda' if torch.cuda.is_available() else 'cpu')
+            )
         
         # 验证配置
         self._validate_config()
@@ -67,11 +234,29 @@ class AudioProcessor:
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
         return {
-            'supported_formats': ['mp3', 'wav', 'flac', 'aac'],
+            'supported_formats': ['mp3', 'wav', 'flac', 'aac', 'ogg', 'opus'],
             'quality': 'high',
+            'preferred_lossy': 'vorbis',  # output_format为auto时使用的有损编码器
             'temp_dir': '/tmp/audio_processing',
             'max_file_size': 1024 * 1024 * 100,  # 100MB
-            'enable_cache': True
+            'enable_cache': True,
+            'cache_bytes': 256 * 1024 * 1024,  # 解码结果缓存上限 256MB
+            'ffmpeg_path': 'ffmpeg',
+            'ffmpeg_batch_size': 16,  # 每个ffmpeg进程处理的文件数
+            'block_size': 16384,  # 分块处理帧数，立体声float32约128KB
+            'echo_delay': 0.25,  # 回声延迟（秒）
+            'echo_decay': 0.5,
+            'reverb_ir': None,  # 混响冲激响应文件，None时使用合成的指数衰减噪声
+            'reverb_time': 1.5,  # 合成冲激响应的衰减时间（秒）
+            'reverb_mix': 0.3,  # 混响湿声比例
+            'fft_threads': 1,
+            'gain_db': 6.0,
+            'device': None,  # 人声分离设备，None表示有CUDA时用GPU
+            'separation_model': 'htdemucs',
+            'separation_batch_size': 4,  # 每次前向推理合并的文件数
+            'io_threads': 2,  # 异步接口使用的后台线程数
+            'buffer_pool_size': 2,  # 每种尺寸最多缓存的解码缓冲区数量
+            'buffer_pool_bytes': 128 * 1024 * 1024  # 缓冲区池总大小上限 128MB
         }
     
     def _validate_config(self) -> None:
@@ -79,19 +264,59 @@ class AudioProcessor:
         if not self.supported_formats:
             raise AudioProcessingError("支持的格式列表不能为空")
         
-        # 确保临时目录存在
-        temp_dir = Path(self.config.get('temp_dir', '/tmp/audio_processing'))
-        temp_dir.mkdir(parents=True, exist_ok=True)
+        preferred_lossy = self.config.get('preferred_lossy', 'vorbis')
+        if preferred_lossy not in _LOSSY_EXTENSIONS:
+            raise AudioProcessingError(f"不支持的有损编码器: {preferred_lossy}")
+        
+        # output_format默认为auto，对应的格式必须在支持列表中，否则转换时才报错
+        lossy_format = _LOSSY_EXTENSIONS[preferred_lossy]
+        if lossy_format not in self.supported_formats:
+            raise AudioProcessingError(
+                f"有损编码器 {preferred_lossy} 的输出格式 {lossy_format} 不在支持的格式列表中，"
+                f"请将其加入supported_formats或修改preferred_lossy"
+            )
+        
+        # 确保临时目录存在，每个进程每个目录只创建一次
+        temp_dir = os.path.abspath(self.config.get('temp_dir', '/tmp/audio_processing'))
+        with AudioProcessor._temp_dir_lock:
+            if temp_dir not in AudioProcessor._ensured_temp_dirs:
+                os.makedirs(temp_dir, exist_ok=True)
+                AudioProcessor._ensured_temp_dirs.add(temp_dir)
+    
+    @staticmethod
+    def _stat_or_raise(path: str,
+                       stat_result: Optional[os.stat_result] = None) -> os.stat_result:
+        """
+        获取文件状态，一次系统调用同时完成存在性检查
+        
+        Args:
+            path: 文件路径
+            stat_result: 调用方已获取的文件状态，提供时直接返回
+        
+        Raises:
+            FileNotFoundError: 文件不存在时
+        """
+        if stat_result is not None:
+            return stat_result
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"音频文件不存在: {path}") from None
     
-    def convert_format(self, input_file: str, output_format: str, 
-                      quality: str = "high") -> str:
+    def convert_format(self, input_file: str, output_format: str = "auto", 
+                      quality: str = "high", *,
+                      stat_result: Optional[os.stat_result] = None) -> str:
         """
         转换音频文件格式
         
+        output_format为auto时按preferred_lossy选择有损编码器。编码速度
+        Vorbis > AAC > MP3，MP3编码最慢，仅在需要兼容性时显式指定mp3
+        
         Args:
             input_file: 输入文件路径
-            output_format: 输出格式 (mp3, wav, flac, aac)
+            output_format: 输出格式 (auto, mp3, wav, flac, aac, ogg, opus)
             quality: 音质设置 (low, medium, high)
+            stat_result: 已获取的文件状态（可选），提供时不再stat
         
         Returns:
             输出文件路径
@@ -107,149 +332,842 @@ class AudioProcessor:
             >>> print(output_file)
             "song.mp3"
         """
+        # 验证输入文件
+        self._stat_or_raise(input_file, stat_result)
+        
+        # 验证输出格式
+        output_format = self._resolve_format(output_format)
+        
+        # 生成输出文件路径
+        output_file = _derive_output(input_file, new_ext=output_format)
+        
+        logger.info("开始转换格式: %s -> %s", input_file, output_file)
+        
+        input_ext = os.path.splitext(input_file)[1].lower().lstrip('.')
         try:
-            # 验证输入文件
-            if not os.path.exists(input_file):
-                raise FileNotFoundError(f"输入文件不存在: {input_file}")
-            
-            # 验证输出格式
-            if output_format.lower() not in self.supported_formats:
-                raise FormatNotSupportedError(
-                    f"不支持的输出格式: {output_format}"
-                )
-            
-            # 生成输出文件路径
-            input_path = Path(input_file)
-            output_file = input_path.with_suffix(f'.{output_format}')
-            
-            logger.info(f"开始转换格式: {input_file} -> {output_file}")
+            if input_ext in _LOSSLESS_FORMATS and output_format in _LOSSLESS_FORMATS:
+                # WAV/FLAC之间直接用libsndfile转换，省去ffmpeg的启动开销
+                self._convert_lossless(input_file, output_file, output_format)
+            else:
+                self._convert_with_ffmpeg(input_file, output_file, quality)
+        except (OSError, RuntimeError) as e:
+            logger.error("格式转换失败: %s", e)
+            raise AudioProcessingError(f"格式转换失败: {e}") from e
+        
+        logger.info("格式转换完成: %s", output_file)
+        return output_file
+    
+    def load_audio(self, audio_file: str) -> Tuple[np.ndarray, int]:
+        """
+        加载整个音频文件，解码结果按LRU缓存，供预览等重复打开的场景使用
+        
+        Args:
+            audio_file: 音频文件路径
+        
+        Returns:
+            (只读的float32采样数组, 采样率)，数组形状为(frames, channels)
+        """
+        st = self._stat_or_raise(audio_file)
+        key = (audio_file, st.st_mtime_ns, st.st_size)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            data, sample_rate = sf.read(audio_file, dtype='float32', always_2d=True)
+        except (OSError, RuntimeError) as e:
+            logger.error("加载音频失败: %s", e)
+            raise AudioProcessingError(f"加载音频失败: {e}") from e
+        # 缓存中的数组被多处共享，禁止修改
+        data.flags.writeable = False
+        self._cache_put(key, (data, sample_rate))
+        return data, sample_rate
+    
+    def _cache_get(self, key: Tuple[str, int, int]) -> Optional[Tuple[np.ndarray, int]]:
+        """查询解码缓存，命中时移到最近使用的位置"""
+        with self._cache_lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+            return value
+    
+    def _cache_put(self, key: Tuple[str, int, int], value: Tuple[np.ndarray, int]) -> None:
+        """写入解码缓存，超出cache_bytes时淘汰最久未使用的结果"""
+        size = value[0].nbytes
+        if not self.config.get('enable_cache', True) or size > self._cache_bytes_max:
+            return
+        
+        with self._cache_lock:
+            if key in self.cache:
+                return
+            self.cache[key] = value
+            self._cache_bytes += size
+            while self._cache_bytes > self._cache_bytes_max:
+                _, (evicted, _) = self.cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+    
+    def _resolve_format(self, output_format: str) -> str:
+        """
+        规范化输出格式，auto替换为preferred_lossy对应的扩展名
+        
+        Raises:
+            FormatNotSupportedError: 当输出格式不支持时
+        """
+        output_format = output_format.lower()
+        if output_format == 'auto':
+            output_format = _LOSSY_EXTENSIONS[self.config.get('preferred_lossy', 'vorbis')]
+        if output_format not in self.supported_formats:
+            raise FormatNotSupportedError(
+                f"不支持的输出格式: {output_format}"
+            )
+        return output_format
+    
+    def _convert_lossless(self, input_file: str, output_file: str,
+                          output_format: str) -> None:
+        """使用soundfile在WAV/FLAC之间转换，尽量保留原始采样精度"""
+        file_format = _LOSSLESS_FORMATS[output_format]
+        subtype = sf.info(input_file).subtype
+        if not sf.check_format(file_format, subtype):
+            subtype = sf.default_subtype(file_format)
+        
+        with sf.SoundFile(input_file) as f:
+            with self._lease_buffer(f.frames, f.channels,
+                                    _SUBTYPE_DTYPES.get(subtype, 'float32')) as data:
+                f.read(always_2d=True, out=data)
+                sf.write(output_file, data, f.samplerate, subtype=subtype, format=file_format)
+    
+    @contextmanager
+    def _lease_buffer(self, frames: int, channels: int, dtype: str) -> Iterator[np.ndarray]:
+        """
+        从缓冲区池借出一个(frames, channels)的数组，退出时归还
+        
+        借出的数组内容未清零，调用方需完整写入后再读取
+        """
+        buffer = self._get_buffer(frames, channels, dtype)
+        try:
+            yield buffer[:frames]
+        finally:
+            self._put_buffer(buffer)
+    
+    def _get_buffer(self, frames: int, channels: int, dtype: str) -> np.ndarray:
+        """取出可容纳frames帧的缓冲区，池中没有时新分配"""
+        capacity = 1 << max(frames - 1, 0).bit_length()
+        key = (capacity, channels, np.dtype(dtype).str)
+        with self._pool_lock:
+            pool = self._buffer_pool.get(key)
+            if pool:
+                buffer = pool.pop()
+                self._pool_bytes -= buffer.nbytes
+                return buffer
+        return np.empty((capacity, channels), dtype=dtype)
+    
+    def _put_buffer(self, buffer: np.ndarray) -> None:
+        """
+        归还缓冲区，超出buffer_pool_size的直接释放
+        
+        池总大小超过buffer_pool_bytes时，从最久未归还的尺寸开始释放
+        """
+        budget = self.config.get('buffer_pool_bytes', 128 * 1024 * 1024)
+        if buffer.nbytes > budget:
+            return
+        
+        key = (buffer.shape[0], buffer.shape[1], buffer.dtype.str)
+        with self._pool_lock:
+            pool = self._buffer_pool.setdefault(key, deque())
+            self._buffer_pool.move_to_end(key)
+            if len(pool) >= self.config.get('buffer_pool_size', 2):
+                return
+            pool.append(buffer)
+            self._pool_bytes += buffer.nbytes
             
-            # TODO: 实现具体的格式转换逻辑
-            # 这里应该调用实际的音频处理库
+            while self._pool_bytes > budget:
+                oldest_key, oldest = next(iter(self._buffer_pool.items()))
+                if oldest:
+                    self._pool_bytes -= oldest.popleft().nbytes
+                if not oldest:
+                    del self._buffer_pool[oldest_key]
+    
+    def _convert_with_ffmpeg(self, input_file: str, output_file: str,
+                             quality: str) -> None:
+        """调用ffmpeg完成有损编码"""
+        self._run_ffmpeg([(input_file, output_file)], quality)
+    
+    def _run_ffmpeg(self, pairs: List[Tuple[str, str]], quality: str) -> None:
+        """
+        用一个ffmpeg进程完成多组(输入, 输出)的编码
+        
+        多个文件共用一次进程启动和编解码库初始化
+        """
+        bitrate = _LOSSY_BITRATES.get(quality, _LOSSY_BITRATES['high'])
+        command = [
+            self.config.get('ffmpeg_path', 'ffmpeg'),
+            '-nostdin', '-hide_banner', '-loglevel', 'error', '-y'
+        ]
+        for input_file, _ in pairs:
+            command += ['-i', input_file]
+        for index, (_, output_file) in enumerate(pairs):
+            command += ['-map', f'{index}:a']
+            codec = _LOSSY_CODECS.get(os.path.splitext(output_file)[1][1:].lower())
+            if codec:
+                command += ['-c:a', codec]
+            command += ['-b:a', bitrate, output_file]
+        
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            raise AudioProcessingError(
+                f"ffmpeg转换失败: {result.stderr.decode('utf-8', 'replace').strip()}"
+            )
+    
+    def convert_formats(self, input_files: List[str], output_format: str = "auto",
+                        quality: str = "high") -> List[Optional[str]]:
+        """
+        批量转换音频文件格式
+        
+        WAV/FLAC之间的转换走soundfile，其余文件每ffmpeg_batch_size个共用一个ffmpeg进程
+        
+        Args:
+            input_files: 输入文件路径列表
+            output_format: 输出格式，取值同convert_format
+            quality: 音质设置 (low, medium, high)
+        
+        Returns:
+            与input_files顺序一致的输出文件路径列表，转换失败的文件对应None
             
-            logger.info(f"格式转换完成: {output_file}")
-            return str(output_file)
+        Raises:
+            FormatNotSupportedError: 当输出格式不支持时
+        """
+        output_format = self._resolve_format(output_format)
+        
+        results: List[Optional[str]] = [None] * len(input_files)
+        pending = []
+        for index, input_file in enumerate(input_files):
+            try:
+                self._stat_or_raise(input_file)
+            except FileNotFoundError as e:
+                logger.error("格式转换失败: %s", e)
+                continue
             
-        except Exception as e:
-            logger.error(f"格式转换失败: {str(e)}")
-            raise AudioProcessingError(f"格式转换失败: {str(e)}")
+            output_file = _derive_output(input_file, new_ext=output_format)
+            if (os.path.splitext(input_file)[1].lower().lstrip('.') in _LOSSLESS_FORMATS
+                    and output_format in _LOSSLESS_FORMATS):
+                try:
+                    self._convert_lossless(input_file, output_file, output_format)
+                    results[index] = output_file
+                except (RuntimeError, OSError) as e:
+                    logger.error("格式转换失败: %s, 错误: %s", input_file, e)
+            else:
+                pending.append((index, input_file, output_file))
+        
+        batch_size = max(1, self.config.get('ffmpeg_batch_size', 16))
+        for start in range(0, len(pending), batch_size):
+            group = pending[start:start + batch_size]
+            try:
+                self._run_ffmpeg([(i, o) for _, i, o in group], quality)
+                for index, _, output_file in group:
+                    results[index] = output_file
+            except (AudioProcessingError, OSError) as e:
+                if len(group) == 1:
+                    logger.error("格式转换失败: %s, 错误: %s", group[0][1], e)
+                    continue
+                # 整批失败时逐个重试，找出出错的文件
+                logger.warning("批量转换失败，逐个重试: %s", e)
+                for index, input_file, output_file in group:
+                    try:
+                        self._run_ffmpeg([(input_file, output_file)], quality)
+                        results[index] = output_file
+                    except (AudioProcessingError, OSError) as e:
+                        logger.error("格式转换失败: %s, 错误: %s", input_file, e)
+        
+        # 统计成功数需要遍历结果，仅在日志会输出时计算
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("批量格式转换完成: 成功 %d/%d",
+                        sum(1 for r in results if r), len(input_files))
+        return results
     
     def extract_vocals(self, audio_file: str, 
-                      output_file: Optional[str] = None) -> str:
+                      output_file: Optional[str] = None, *,
+                      stat_result: Optional[os.stat_result] = None) -> str:
         """
         提取人声
         
         Args:
             audio_file: 输入音频文件
             output_file: 输出文件路径（可选）
+            stat_result: 已获取的文件状态（可选），提供时不再stat
         
         Returns:
             输出文件路径
         """
+        self._stat_or_raise(audio_file, stat_result)
+        
+        if output_file is None:
+            output_file = _derive_output(audio_file, '_vocals')
+        
+        logger.info("开始提取人声: %s", audio_file)
+        
         try:
-            if not os.path.exists(audio_file):
-                raise FileNotFoundError(f"音频文件不存在: {audio_file}")
-            
-            if output_file is None:
-                input_path = Path(audio_file)
-                output_file = input_path.with_stem(f"{input_path.stem}_vocals")
-            
-            logger.info(f"开始提取人声: {audio_file}")
-            
-            # TODO: 实现人声提取逻辑
-            # 这里应该调用实际的音轨分离库
-            
-            logger.info(f"人声提取完成: {output_file}")
-            return str(output_file)
+            self._separate_vocals([(audio_file, str(output_file))])
+        except (OSError, RuntimeError) as e:
+            logger.error("人声提取失败: %s", e)
+            raise AudioProcessingError(f"人声提取失败: {e}") from e
+        
+        logger.info("人声提取完成: %s", output_file)
+        return str(output_file)
+    
+    def extract_vocals_batch(self, audio_files: List[str]) -> List[str]:
+        """
+        批量提取人声
+        
+        每separation_batch_size个文件合并为一次模型推理
+        
+        Args:
+            audio_files: 输入音频文件列表
+        
+        Returns:
+            与audio_files顺序一致的输出文件路径列表
+        """
+        pairs = []
+        for audio_file in audio_files:
+            self._stat_or_raise(audio_file)
+            pairs.append((audio_file, _derive_output(audio_file, '_vocals')))
+        
+        logger.info("开始批量提取人声: %d 个文件", len(pairs))
+        
+        batch_size = max(1, self.config.get('separation_batch_size', 4))
+        try:
+            for start in range(0, len(pairs), batch_size):
+                self._separate_vocals(pairs[start:start + batch_size])
+        except (OSError, RuntimeError) as e:
+            logger.error("批量人声提取失败: %s", e)
+            raise AudioProcessingError(f"批量人声提取失败: {e}") from e
+        
+        logger.info("批量人声提取完成: %d 个文件", len(pairs))
+        return [output_file for _, output_file in pairs]
+    
+    def _get_separator(self):
+        """获取常驻设备上的分离模型，首次调用时加载"""
+        if torch is None:
+            raise AudioProcessingError("人声提取需要安装torch和demucs")
+        if self._separator is None:
+            model_name = self.config.get('separation_model', 'htdemucs')
+            model = get_model(model_name)
+            model.to(self.device).eval()
+            self._separator = model
+            logger.info("分离模型已加载: %s, 设备: %s", model_name, self.device)
+        return self._separator
+    
+    def _separate_vocals(self, pairs: List[Tuple[str, str]]) -> None:
+        """将一组文件补齐到相同长度后一次推理，分别写出人声轨"""
+        model = self._get_separator()
+        
+        waves, lengths, stats = [], [], []
+        for input_file, _ in pairs:
+            data, sample_rate = self.load_audio(input_file)
+            if sample_rate != model.samplerate:
+                data = resample_poly(data, model.samplerate, sample_rate,
+                                     axis=0).astype(np.float32)
+            # 声道数对齐到模型要求（单声道复制，多声道截断）
+            if data.shape[1] < model.audio_channels:
+                data = np.repeat(data[:, :1], model.audio_channels, axis=1)
+            data = data[:, :model.audio_channels]
             
-        except Exception as e:
-            logger.error(f"人声提取失败: {str(e)}")
-            raise AudioProcessingError(f"人声提取失败: {str(e)}")
+            # 与demucs命令行一致，按参考信号归一化（生成新数组，不修改缓存中的数据）
+            ref = data.mean(axis=1)
+            mean, std = float(ref.mean()), float(ref.std()) or 1.0
+            waves.append(torch.from_numpy((data - mean) / std))
+            lengths.append(len(data))
+            stats.append((mean, std))
+        
+        # (batch, frames, channels) -> (batch, channels, frames)
+        batch = torch.nn.utils.rnn.pad_sequence(waves, batch_first=True).transpose(1, 2)
+        with torch.no_grad(), torch.autocast(device_type=self.device.type, dtype=torch.bfloat16,
+                                             enabled=self.device.type == 'cuda'):
+            sources = apply_model(model, batch, device=self.device, split=True)
+        vocals = sources[:, model.sources.index('vocals')].float().cpu().numpy()
+        
+        for (_, output_file), length, (mean, std), track in zip(pairs, lengths, stats, vocals):
+            sf.write(output_file, track[:, :length].T * std + mean, model.samplerate)
     
     def apply_effects(self, audio_file: str, effects: List[str],
-                     output_file: Optional[str] = None) -> str:
+                     output_file: Optional[str] = None, *,
+                     stat_result: Optional[os.stat_result] = None) -> str:
         """
         应用音效
         
+        按block_size分块流式处理，内存占用与文件长度无关
+        
         Args:
             audio_file: 输入音频文件
-            effects: 音效列表 (echo, reverb, equalizer等)
+            effects: 音效列表 (echo, gain, reverb)
             output_file: 输出文件路径（可选）
+            stat_result: 已获取的文件状态（可选），提供时不再stat
         
         Returns:
             输出文件路径
         """
+        st = self._stat_or_raise(audio_file, stat_result)
+        
+        for name in effects:
+            if name not in self._EFFECTS:
+                raise AudioProcessingError(f"不支持的音效: {name}")
+        
+        if output_file is None:
+            output_file = _derive_output(audio_file, '_effects')
+        
+        logger.info("开始应用音效: %s, 音效: %s", audio_file, effects)
+        
         try:
-            if not os.path.exists(audio_file):
-                raise FileNotFoundError(f"音频文件不存在: {audio_file}")
+            info = sf.info(audio_file)
+            subtype = info.subtype if sf.check_format(info.format, info.subtype) else None
+            block_size = self.config.get('block_size', 16384)
+            stages = [self._make_stage(name, info.samplerate, info.channels, block_size)
+                      for name in effects]
+            chain = self._build_kernel_chain(effects, info.samplerate, info.channels)
+            # 融合内核自带延迟线，不需要历史区
+            ghost = 0 if chain is not None else self._effects_history(effects, info.samplerate)
+            ring = self._get_ring(block_size + ghost, info.channels)
+            # 每个音效保留自身输入的最后ghost帧，作为下一块的历史数据
+            histories = [np.zeros((ghost, info.channels), dtype=np.float32)
+                         for _ in stages]
+            
+            # 优先使用已缓存的解码结果；16位PCM WAV直接内存映射，转换为float32时一次写入缓冲区
+            cached = self._cache_get((audio_file, st.st_mtime_ns, st.st_size))
+            pcm = None
+            if cached is None and info.format == 'WAV':
+                pcm = self._read_wav_pcm(audio_file)
             
-            if output_file is None:
-                input_path = Path(audio_file)
-                output_file = input_path.with_stem(f"{input_path.stem}_effects")
+            if cached is not None:
+                data = cached[0]
+                blocks = (data[i:i + block_size] for i in range(0, len(data), block_size))
+                scale = 1.0
+            elif pcm is not None:
+                blocks = (pcm[i:i + block_size] for i in range(0, len(pcm), block_size))
+                scale = 1.0 / 32768.0
+            else:
+                blocks = sf.blocks(audio_file, blocksize=block_size,
+                                   dtype='float32', always_2d=True)
+                scale = 1.0
             
-            logger.info(f"开始应用音效: {audio_file}, 音效: {effects}")
+            with sf.SoundFile(str(output_file), 'w', info.samplerate, info.channels,
+                              subtype=subtype, format=info.format) as out:
+                for block in blocks:
+                    n = len(block)
+                    src, dst = 0, 1
+                    np.multiply(block, scale, out=ring[src, ghost:ghost + n],
+                                casting='unsafe')
+                    if chain is not None:
+                        _apply_chain_kernel(ring[src, :n], *chain)
+                        # 推进各延迟线的写入位置
+                        delays, positions = chain[2], chain[4]
+                        positions[:] = (positions + n) % delays
+                    else:
+                        for i, stage in enumerate(stages):
+                            ring[src, :ghost] = histories[i]
+                            histories[i][:] = ring[src, n:ghost + n]
+                            stage(ring[src, :ghost + n], ring[dst, ghost:ghost + n], ghost,
+                                  info.samplerate)
+                            src, dst = dst, src
+                    out.write(ring[src, ghost:ghost + n])
+        except (OSError, RuntimeError) as e:
+            logger.error("音效应用失败: %s", e)
+            raise AudioProcessingError(f"音效应用失败: {e}") from e
+        
+        logger.info("音效应用完成: %s", output_file)
+        return str(output_file)
+    
+    @staticmethod
+    def _read_wav_pcm(path: str) -> Optional[np.ndarray]:
+        """
+        以内存映射方式读取16位PCM WAV的采样数据
+        
+        Returns:
+            形状为(frames, channels)的只读int16数组，非16位PCM WAV返回None
+        """
+        with open(path, 'rb') as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+                return None
             
-            # TODO: 实现音效应用逻辑
-            # 这里应该调用实际的音效处理库
+            fmt = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    if chunk_size & 1:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    data_offset = f.tell()
+                    break
+                else:
+                    # RIFF块按偶数字节对齐
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
             
-            logger.info(f"音效应用完成: {output_file}")
-            return str(output_file)
+            if fmt is None or len(fmt) < 16:
+                return None
+            audio_format, channels, _, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                audio_format = struct.unpack('<H', fmt[24:26])[0]
+            if audio_format != _WAVE_FORMAT_PCM or bits != 16 or channels == 0:
+                return None
             
-        except Exception as e:
-            logger.error(f"音效应用失败: {str(e)}")
-            raise AudioProcessingError(f"音效应用失败: {str(e)}")
+            # data块长度可能未写全，以实际文件大小为准
+            data_size = min(chunk_size, os.fstat(f.fileno()).st_size - data_offset)
+        
+        frames = data_size // (2 * channels)
+        if frames == 0:
+            return None
+        return np.memmap(path, dtype='<i2', mode='r', offset=data_offset,
+                         shape=(frames, channels))
     
-    def get_audio_info(self, audio_file: str) -> Dict[str, Any]:
+    # 音效名称与处理方法的对应关系
+    _EFFECTS = {
+        'echo': '_effect_echo',
+        'gain': '_effect_gain',
+        'reverb': '_effect_reverb',
+    }
+    
+    # 可由融合内核处理的音效及其操作码
+    _EFFECT_OPCODES = {
+        'echo': _OP_ECHO,
+        'gain': _OP_GAIN,
+    }
+    
+    def _build_kernel_chain(self, effects: List[str], sample_rate: int,
+                            channels: int) -> Optional[tuple]:
+        """
+        将音效列表翻译为融合内核的参数
+        
+        未安装numba或含内核不支持的音效时返回None，
+        此时按音效逐个处理
+        """
+        if njit is None or not all(name in self._EFFECT_OPCODES for name in effects):
+            return None
+        
+        opcodes = np.array([self._EFFECT_OPCODES[name] for name in effects], dtype=np.int8)
+        params = np.empty(len(effects), dtype=np.float32)
+        delays = np.ones(len(effects), dtype=np.int64)
+        for k, name in enumerate(effects):
+            if name == 'gain':
+                params[k] = 10 ** (self.config.get('gain_db', 0.0) / 20)
+            else:
+                params[k] = self.config.get('echo_decay', 0.5)
+                delays[k] = max(1, int(self.config.get('echo_delay', 0.25) * sample_rate))
+        
+        lines = np.zeros((len(effects), int(delays.max(initial=1)), channels), dtype=np.float32)
+        positions = np.zeros(len(effects), dtype=np.int64)
+        return opcodes, params, delays, lines, positions
+    
+    def _get_ring(self, frames: int, channels: int) -> np.ndarray:
+        """
+        获取分块处理用的乒乓缓冲区
+        
+        形状为(2, ghost + block_size, channels)，两个槽位交替作为音效的输入和输出，
+        每个槽位前ghost帧存放上一块的历史数据，缓冲区按线程独立复用
+        """
+        ring = getattr(self._scratch, 'ring', None)
+        if ring is None or ring.shape[1:] != (frames, channels):
+            ring = np.zeros((2, frames, channels), dtype=np.float32)
+            self._scratch.ring = ring
+        return ring
+    
+    def _make_stage(self, name: str, sample_rate: int, channels: int,
+                    block_size: int):
+        """生成音效处理函数，有内部状态的音效在此绑定本次处理的状态"""
+        stage = getattr(self, self._EFFECTS[name])
+        if name == 'reverb':
+            spectra = self._get_ir_spectra(sample_rate, channels, block_size)
+            # FFT工作区按(分块大小, 声道数)缓存，每个线程一份
+            fft_plans = getattr(self._scratch, 'fft_plans', None)
+            if fft_plans is None:
+                fft_plans = self._scratch.fft_plans = {}
+            workspace = fft_plans.get((block_size, channels))
+            if workspace is None:
+                workspace = np.zeros((2 * block_size, channels), dtype=np.float32)
+                fft_plans[(block_size, channels)] = workspace
+            stage = partial(stage, _PartitionedConvolver(
+                spectra, workspace, self.config.get('fft_threads', 1)
+            ))
+        return stage
+    
+    def _get_ir_spectra(self, sample_rate: int, channels: int,
+                        block_size: int) -> np.ndarray:
+        """
+        获取按block_size分块的冲激响应频谱
+        
+        Returns:
+            形状为(分块数, block_size + 1, channels)的复数数组
+        """
+        ir_path = self.config.get('reverb_ir')
+        reverb_time = self.config.get('reverb_time', 1.5)
+        source = ir_path or f"synthetic:{reverb_time}"
+        key = (source, sample_rate, block_size, channels)
+        spectra = self._ir_cache.get(key)
+        if spectra is not None:
+            return spectra
+        
+        if ir_path:
+            ir, ir_rate = sf.read(ir_path, dtype='float32', always_2d=True)
+            if ir_rate != sample_rate:
+                ir = resample_poly(ir, sample_rate, ir_rate, axis=0).astype(np.float32)
+        else:
+            # 指数衰减的白噪声，reverb_time秒内衰减60dB，按能量归一化
+            frames = max(1, int(reverb_time * sample_rate))
+            noise = np.random.default_rng(0).standard_normal((frames, 1)).astype(np.float32)
+            envelope = np.exp(-6.9 * np.arange(frames) / frames, dtype=np.float32)
+            ir = noise * envelope[:, None]
+            ir /= np.sqrt(np.sum(ir * ir))
+        # 声道数不一致时用第一个声道
+        if ir.shape[1] != channels:
+            ir = np.repeat(ir[:, :1], channels, axis=1)
+        
+        partitions = -(-len(ir) // block_size)
+        padded = np.zeros((partitions * block_size, channels), dtype=np.float32)
+        padded[:len(ir)] = ir
+        spectra = sp_fft.rfft(padded.reshape(partitions, block_size, channels),
+                              n=2 * block_size, axis=1).astype(np.complex64)
+        self._ir_cache[key] = spectra
+        return spectra
+    
+    def _effects_history(self, effects: List[str], sample_rate: int) -> int:
+        """计算音效链需要回看的历史帧数"""
+        if 'echo' in effects:
+            return max(1, int(self.config.get('echo_delay', 0.25) * sample_rate))
+        return 0
+    
+    def _effect_echo(self, src: np.ndarray, dst: np.ndarray, ghost: int,
+                     sample_rate: int) -> None:
+        """回声：叠加延迟echo_delay秒、衰减echo_decay的原信号"""
+        n = len(dst)
+        delay = max(1, int(self.config.get('echo_delay', 0.25) * sample_rate))
+        np.multiply(src[ghost - delay:ghost - delay + n],
+                    self.config.get('echo_decay', 0.5), out=dst)
+        dst += src[ghost:]
+    
+    def _effect_reverb(self, convolver: '_PartitionedConvolver', src: np.ndarray,
+                       dst: np.ndarray, ghost: int, sample_rate: int) -> None:
+        """混响：与冲激响应做分块卷积，按reverb_mix混合干湿声"""
+        mix = self.config.get('reverb_mix', 0.3)
+        wet = convolver.process(src[ghost:])
+        np.multiply(src[ghost:], 1.0 - mix, out=dst)
+        dst += mix * wet
+    
+    def _effect_gain(self, src: np.ndarray, dst: np.ndarray, ghost: int,
+                     sample_rate: int) -> None:
+        """增益：按gain_db调整音量"""
+        np.multiply(src[ghost:], 10 ** (self.config.get('gain_db', 0.0) / 20), out=dst)
+    
+    def get_audio_info(self, audio_file: str, *,
+                       stat_result: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """
         获取音频文件信息
         
         Args:
             audio_file: 音频文件路径
+            stat_result: 已获取的文件状态（可选），提供时不再stat
         
         Returns:
             音频信息字典
         """
-        try:
-            if not os.path.exists(audio_file):
-                raise FileNotFoundError(f"音频文件不存在: {audio_file}")
-            
-            # TODO: 实现音频信息获取逻辑
-            # 这里应该调用实际的音频分析库
-            
-            info = {
-                'file_path': audio_file,
-                'file_size': os.path.getsize(audio_file),
-                'format': 'unknown',
-                'duration': 0.0,
-                'sample_rate': 0,
-                'channels': 0,
-                'bitrate': 0
-            }
-            
-            return info
-            
-        except Exception as e:
-            logger.error(f"获取音频信息失败: {str(e)}")
-            raise AudioProcessingError(f"获取音频信息失败: {str(e)}")
+        st = self._stat_or_raise(audio_file, stat_result)
+        
+        # 返回副本，避免调用方修改缓存中的结果
+        return dict(_audio_info_impl(audio_file, st.st_mtime_ns, st.st_size))
+    
+    def iter_audio_files(self, root: str) -> Iterator[os.DirEntry]:
+        """
+        列出目录下支持格式的音频文件（不递归）
+        
+        Args:
+            root: 目录路径
+        
+        Returns:
+            DirEntry迭代器，可直接传给process_batch
+        """
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if (entry.is_file()
+                        and os.path.splitext(entry.name)[1][1:].lower() in self.supported_formats):
+                    yield entry
+    
+    def process_batch(self, files: Iterable[Union[str, os.DirEntry]], op: str = 'convert_format',
+                      **kwargs) -> List[Any]:
+        """
+        使用多进程批量处理文件
+        
+        Args:
+            files: 输入文件路径或iter_audio_files返回的DirEntry（列表或迭代器均可），
+                DirEntry会附带已获取的文件状态，工作进程中不再stat
+            op: 对每个文件调用的方法名 (convert_format, extract_vocals, apply_effects, get_audio_info)
+            **kwargs: 传给该方法的其余参数
+        
+        Returns:
+            与files顺序一致的结果列表，处理失败的文件对应None
+        """
+        if op not in _BATCH_OPS:
+            raise AudioProcessingError(f"不支持的批量操作: {op}")
+        files = list(files)
+        if not files:
+            return []
+        
+        max_workers = self.config.get('max_workers') or os.cpu_count() or 1
+        chunksize = max(1, len(files) // (4 * max_workers))
+        
+        logger.info("开始批量处理: %d 个文件, 操作: %s, 进程数: %d", len(files), op, max_workers)
+        
+        # DirEntry不能跨进程传递，换成(路径, 文件状态)
+        items = [(f.path, f.stat()) if isinstance(f, os.DirEntry) else (f, None)
+                 for f in files]
+        
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(self.config,)) as executor:
+            results = list(executor.map(partial(_run_op, op, kwargs), items,
+                                        chunksize=chunksize))
+        
+        if logger.isEnabledFor(logging.INFO):
+            success_count = sum(1 for r in results if r is not None)
+            logger.info("批量处理完成: 成功 %d/%d", success_count, len(files))
+        return results
+    
+    async def aconvert_format(self, *args, **kwargs) -> str:
+        """convert_format的异步版本，在后台线程执行，不阻塞事件循环"""
+        return await self._run_in_io_thread(self.convert_format, *args, **kwargs)
+    
+    async def aextract_vocals(self, *args, **kwargs) -> str:
+        """extract_vocals的异步版本"""
+        return await self._run_in_io_thread(self.extract_vocals, *args, **kwargs)
+    
+    async def aapply_effects(self, *args, **kwargs) -> str:
+        """apply_effects的异步版本"""
+        return await self._run_in_io_thread(self.apply_effects, *args, **kwargs)
+    
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        """获取后台线程池，首次使用时创建"""
+        if self._io_executor is None:
+            # 线程数受io_threads限制，避免与process_batch的进程池争抢CPU
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=self.config.get('io_threads', 2),
+                thread_name_prefix='audio-io'
+            )
+        return self._io_executor
+    
+    def _run_in_io_thread(self, func, *args, **kwargs) -> asyncio.Future:
+        """将同步方法提交到后台线程池"""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._get_io_executor(), partial(func, *args, **kwargs))
+    
+    def close(self) -> None:
+        """关闭后台线程池"""
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=False)
+            self._io_executor = None
     
     def cleanup_cache(self) -> None:
         """清理缓存"""
-        self.cache.clear()
+        with self._cache_lock:
+            self.cache.clear()
+            self._cache_bytes = 0
+        with self._pool_lock:
+            self._buffer_pool.clear()
+            self._pool_bytes = 0
+        # 替换为新的线程局部对象，各线程下次处理时重新分配工作区
+        self._scratch = threading.local()
+        self._ir_cache.clear()
+        _audio_info_impl.cache_clear()
         logger.info("缓存清理完成")
 
 
+class _PartitionedConvolver:
+    """
+    均匀分块重叠相加卷积器
+    
+    输入按block_size分块做FFT，与预先计算好的冲激响应分块频谱在频域相乘累加，
+    每块只需一次正变换和一次逆变换
+    """
+    
+    __slots__ = ('block_size', 'spectra', 'workspace', 'workers',
+                 'history', 'position', 'overlap')
+    
+    def __init__(self, spectra: np.ndarray, workspace: np.ndarray, workers: int):
+        """
+        Args:
+            spectra: 冲激响应分块频谱，形状(分块数, block_size + 1, channels)
+            workspace: 长度为2 * block_size的FFT输入工作区
+            workers: FFT线程数
+        """
+        partitions, bins, channels = spectra.shape
+        self.block_size = bins - 1
+        self.spectra = spectra
+        self.workspace = workspace
+        self.workers = workers
+        # 频域延迟线：保存最近partitions块输入的频谱
+        self.history = np.zeros_like(spectra)
+        self.position = 0
+        self.overlap = np.zeros((self.block_size, channels), dtype=np.float32)
+    
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """卷积一块输入（不超过block_size帧），返回同样长度的湿声"""
+        n = len(block)
+        size = self.block_size
+        partitions = len(self.spectra)
+        
+        self.workspace[:n] = block
+        self.workspace[n:] = 0
+        self.history[self.position] = sp_fft.rfft(self.workspace, axis=0, workers=self.workers)
+        
+        # 第k个冲激响应分块与k块之前的输入频谱相乘
+        order = (self.position - np.arange(partitions)) % partitions
+        spectrum = np.einsum('kfc,kfc->fc', self.history[order], self.spectra)
+        self.position = (self.position + 1) % partitions
+        
+        output = sp_fft.irfft(spectrum, n=2 * size, axis=0, workers=self.workers)
+        wet = output[:size] + self.overlap
+        self.overlap[:] = output[size:]
+        return wet[:n]
+
+
+# 工作进程内复用的处理器实例
+_worker_processor: Optional[AudioProcessor] = None
+
+
+def _init_worker(config: Dict[str, Any]):
+    """初始化工作进程"""
+    global _worker_processor
+    _worker_processor = AudioProcessor(config)
+
+
+def _run_op(op: str, kwargs: Dict[str, Any],
+            item: Tuple[str, Optional[os.stat_result]]) -> Any:
+    """在工作进程中对单个文件执行指定操作，失败时返回None，不影响同批其他文件"""
+    audio_file, stat_result = item
+    try:
+        return getattr(_worker_processor, op)(audio_file, stat_result=stat_result, **kwargs)
+    except Exception as e:
+        logger.error("批量处理文件失败: %s, 错误: %s", audio_file, e)
+        return None
+
+
 # GUI组件模板
 class AudioProcessorGUI:
     """音频处理器GUI界面"""
     
-    def __init__(self, parent):
+    # 轮询后台任务是否完成的间隔（毫秒）
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, parent, loop: Optional[asyncio.AbstractEventLoop] = None):
         """
         初始化GUI界面
         
         Args:
             parent: 父窗口
+            loop: 正在运行的asyncio事件循环，处理任务在其上调度；
+                  为None时（普通Tk主循环）直接提交到后台线程池，由after()轮询结果
         """
         self.parent = parent
+        self.loop = loop
         self.processor = AudioProcessor()
         self.setup_ui()
     
@@ -258,20 +1176,47 @@ class AudioProcessorGUI:
         # TODO: 实现GUI界面
         pass
     
-    def on_convert_format(self):
-        """格式转换按钮回调"""
-        # TODO: 实现格式转换界面逻辑
-        pass
+    def on_convert_format(self, input_file: str, output_format: str,
+                          quality: str = "high") -> Union[asyncio.Future, Future]:
+        """格式转换按钮回调，转换在后台线程执行，界面保持响应"""
+        # TODO: 从界面控件读取参数
+        return self._submit(self.processor.convert_format, input_file, output_format, quality)
     
-    def on_extract_vocals(self):
+    def on_extract_vocals(self, audio_file: str) -> Union[asyncio.Future, Future]:
         """人声提取按钮回调"""
-        # TODO: 实现人声提取界面逻辑
-        pass
+        # TODO: 从界面控件读取参数
+        return self._submit(self.processor.extract_vocals, audio_file)
     
-    def on_apply_effects(self):
+    def on_apply_effects(self, audio_file: str,
+                         effects: List[str]) -> Union[asyncio.Future, Future]:
         """音效应用按钮回调"""
-        # TODO: 实现音效应用界面逻辑
+        # TODO: 从界面控件读取参数
+        return self._submit(self.processor.apply_effects, audio_file, effects)
+    
+    def on_task_done(self, future: Union[asyncio.Future, Future]) -> None:
+        """后台任务完成回调，在界面线程中执行"""
+        # TODO: 根据future.result()/future.exception()刷新界面
         pass
+    
+    def _submit(self, func, *args) -> Union[asyncio.Future, Future]:
+        """在后台线程执行处理任务，完成后在界面线程调用on_task_done"""
+        executor = self.processor._get_io_executor()
+        if self.loop is not None:
+            # 事件循环线程即界面线程，完成回调直接在其中执行
+            future = self.loop.run_in_executor(executor, partial(func, *args))
+            future.add_done_callback(self.on_task_done)
+            return future
+        
+        future = executor.submit(func, *args)
+        self._poll(future)
+        return future
+    
+    def _poll(self, future: Future) -> None:
+        """用Tk的after()轮询线程池任务，完成后回到界面线程处理结果"""
+        if future.done():
+            self.on_task_done(future)
+        else:
+            self.parent.after(self.POLL_INTERVAL_MS, self._poll, future)
 
 
 if __name__ == "__main__":